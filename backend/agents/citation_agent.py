@@ -3,6 +3,9 @@
 from typing import List, Dict
 from backend.agents.state import AgentState
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class CitationAgent:
@@ -39,39 +42,31 @@ class CitationAgent:
             state["citations"] = []
             return state
         
-        print(f"📝 Adding citations...")
+        logger.info("Adding citations")
         
         # Build citations
-        citations = []
-        citation_map = {}
-        
-        # Add document citations
-        for i, chunk in enumerate(chunks[:5], 1):
-            metadata = chunk.get('metadata', {})
-            filename = metadata.get('filename', 'Unknown Document')
-            page = metadata.get('page_number')
-            
-            citation = {
+        citations = [
+            {
                 'id': i,
                 'type': 'document',
-                'filename': filename,
-                'page': page,
+                'filename': (metadata := chunk.get('metadata') or {}).get('filename', 'Unknown Document'),
+                'page': metadata.get('page_number'),
                 'content_preview': chunk.get('content', '')[:100]
             }
-            citations.append(citation)
-            citation_map[filename] = i
+            for i, chunk in enumerate(chunks[:5], 1)
+        ]
         
         # Add web citations
-        web_start = len(citations) + 1
-        for i, result in enumerate(web_results[:3], web_start):
-            citation = {
+        citations.extend(
+            {
                 'id': i,
                 'type': 'web',
                 'title': result.get('title', 'Web Source'),
                 'url': result.get('url', ''),
                 'snippet': result.get('snippet', '')[:100]
             }
-            citations.append(citation)
+            for i, result in enumerate(web_results[:3], len(citations) + 1)
+        )
         
         # Format final response with citations
         final_response = self._format_with_citations(response, citations)
@@ -79,7 +74,7 @@ class CitationAgent:
         state["citations"] = citations
         state["final_response"] = final_response
         
-        print(f"   ✅ Added {len(citations)} citations")
+        logger.debug("Added %d citations", len(citations))
         
         return state
     
@@ -90,22 +85,22 @@ class CitationAgent:
         # In a more sophisticated version, we could parse the response
         # and add inline citations where sources are mentioned
         
-        formatted = response + "\n\n"
+        parts = [response, "\n\n"]
         
         if citations:
-            formatted += "**Sources:**\n\n"
+            parts.append("**Sources:**\n\n")
             
             for citation in citations:
                 if citation['type'] == 'document':
-                    formatted += f"[{citation['id']}] {citation['filename']}"
+                    parts.append(f"[{citation['id']}] {citation['filename']}")
                     if citation.get('page'):
-                        formatted += f", Page {citation['page']}"
-                    formatted += "\n"
+                        parts.append(f", Page {citation['page']}")
+                    parts.append("\n")
                 elif citation['type'] == 'web':
-                    formatted += f"[{citation['id']}] {citation['title']}\n"
-                    formatted += f"    {citation['url']}\n"
+                    parts.append(f"[{citation['id']}] {citation['title']}\n")
+                    parts.append(f"    {citation['url']}\n")
         
-        return formatted
+        return "".join(parts)
     
     def _add_inline_citations(self, response: str, citation_map: Dict) -> str:
         """
@@ -2,9 +2,16 @@
 
 from typing import List, Dict
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_huggingface import HuggingFaceEndpoint
 from backend.config import settings
+from backend.services.llm_service import get_llm
 from backend.agents.state import AgentState
+from types import MappingProxyType
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Shared read-only stand-in for chunks without metadata
+_EMPTY_METADATA = MappingProxyType({})
 
 
 class GenerationAgent:
@@ -14,15 +21,7 @@ class GenerationAgent:
     
     def __init__(self):
         """Initialize generation agent."""
-        self.llm = None
-        if settings.huggingface_api_key:
-            self.llm = HuggingFaceEndpoint(
-                repo_id=settings.hf_model_name,
-                huggingfacehub_api_token=settings.huggingface_api_key,
-                temperature=0.3,
-                max_new_tokens=1024,
-                task="text-generation"
-            )
+        self.llm = get_llm()
     
     async def generate(self, state: AgentState) -> AgentState:
         """
@@ -46,7 +45,7 @@ class GenerationAgent:
             state["generated_response"] = self._fallback_response(query, chunks, web_results)
             return state
         
-        print(f"🤖 Generating response...")
+        logger.info("Generating response")
         
         # Build context from chunks
         context = self._build_context(chunks, web_results)
@@ -55,7 +54,7 @@ class GenerationAgent:
         response = await self._llm_generate(query, context)
         
         state["generated_response"] = response
-        print(f"   ✅ Response generated ({len(response)} chars)")
+        logger.debug("Response generated (%d chars)", len(response))
         
         return state
     
@@ -67,16 +66,14 @@ class GenerationAgent:
         if chunks:
             context_parts.append("=== Retrieved Documents ===\n")
             for i, chunk in enumerate(chunks[:5], 1):  # Top 5 chunks
-                filename = chunk.get('metadata', {}).get('filename', 'Unknown')
-                page = chunk.get('metadata', {}).get('page_number')
-                content = chunk.get('content', '')
+                metadata = chunk.get('metadata') or _EMPTY_METADATA
+                filename = metadata.get('filename', 'Unknown')
+                page = metadata.get('page_number')
+                page_info = f", Page {page}" if page else ""
                 
-                source_info = f"[Source {i}: {filename}"
-                if page:
-                    source_info += f", Page {page}"
-                source_info += "]"
-                
-                context_parts.append(f"{source_info}\n{content}\n")
+                context_parts.append(
+                    f"[Source {i}: {filename}{page_info}]\n{chunk.get('content', '')}\n"
+                )
         
         # Add web results
         if web_results:
@@ -115,10 +112,18 @@ Answer:"""
         ]
         
         try:
-            response = self.llm.invoke(messages)
-            return response.strip()
+            # Stream tokens so callers watching the workflow's event stream
+            # receive them as they are generated
+            parts = []
+            async for token in self.llm.astream(
+                messages,
+                temperature=0.3,
+                max_new_tokens=1024
+            ):
+                parts.append(token)
+            return "".join(parts).strip()
         except Exception as e:
-            print(f"❌ Generation error: {e}")
+            logger.error("Generation error: %s", e)
             return f"I apologize, but I encountered an error generating a response: {str(e)}"
     
     def _fallback_response(self, query: str, chunks: List[Dict], web_results: List[Dict]) -> str:
@@ -1,11 +1,34 @@
 """Query Analysis Agent - Analyzes user queries and determines search strategy."""
 
-from typing import Dict
+from typing import Dict, Tuple
+from functools import lru_cache
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_huggingface import HuggingFaceEndpoint
 from backend.config import settings
+from backend.services.llm_service import get_llm
 from backend.agents.state import AgentState, QueryAnalysisResult
 import json
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Queries with fewer tokens than this skip the LLM analysis call
+FAST_PATH_MAX_TOKENS = 6
+
+# Rule-based classification patterns (compiled once at import)
+# Pure small talk only: a greeting or thanks with nothing else in the message
+_SMALL_TALK_RE = re.compile(r'\s*(?:hello|hi|hey|thanks|thank you)[\s!.,]*')
+_QUESTION_RE = re.compile(r'^(?:what|why|how|when|where|who)\b')
+_ANALYTICAL_RE = re.compile(r'\b(?:why|how)\b')
+_CURRENT_RE = re.compile(r'\b(?:latest|recent|current|today|now|202[4-6]|this year)\b')
+
+# Analysis JSON object inside an LLM response (tolerates code fences/prose)
+_JSON_RE = re.compile(r'\{[^{}]*"query_type"[^{}]*\}', re.DOTALL)
+
+_STOP_WORDS = frozenset({
+    "what", "is", "the", "a", "an", "in", "on", "at", "to", "for",
+    "of", "and", "or", "but", "with", "from", "by", "about"
+})
 
 
 class QueryAnalysisAgent:
@@ -18,14 +41,7 @@ class QueryAnalysisAgent:
     
     def __init__(self):
         """Initialize query analysis agent."""
-        self.llm = None
-        if settings.huggingface_api_key:
-            self.llm = HuggingFaceEndpoint(
-                repo_id=settings.hf_model_name,
-                huggingfacehub_api_token=settings.huggingface_api_key,
-                temperature=0.1,
-                max_new_tokens=512
-            )
+        self.llm = get_llm()
     
     async def analyze(self, state: AgentState) -> AgentState:
         """
@@ -42,11 +58,11 @@ class QueryAnalysisAgent:
         # Add processing step
         state["processing_steps"].append("query_analysis")
         
-        if self.llm:
+        if self.llm and not self._fast_path(query):
             # Use LLM for sophisticated analysis
             result = await self._llm_analysis(query)
         else:
-            # Fallback to rule-based analysis
+            # Short/conversational queries (or no LLM): rule-based analysis
             result = self._rule_based_analysis(query)
         
         # Update state
@@ -54,13 +70,24 @@ class QueryAnalysisAgent:
         state["needs_web_search"] = result["needs_web_search"]
         state["search_keywords"] = result["search_keywords"]
         
-        print(f"📊 Query Analysis:")
-        print(f"   Type: {result['query_type']}")
-        print(f"   Web search needed: {result['needs_web_search']}")
-        print(f"   Keywords: {result['search_keywords']}")
+        logger.debug(
+            "Query analysis: type=%s, web_search=%s, keywords=%s",
+            result["query_type"],
+            result["needs_web_search"],
+            result["search_keywords"]
+        )
         
         return state
     
+    def _fast_path(self, query: str) -> bool:
+        """
+        Decide whether a query can skip the LLM analysis call.
+        
+        Very short queries and conversational messages are classified just
+        as well by the rule-based analysis, which saves an LLM round-trip.
+        """
+        return len(query.split()) < FAST_PATH_MAX_TOKENS or is_small_talk(query)
+    
     async def _llm_analysis(self, query: str) -> QueryAnalysisResult:
         """Use LLM for query analysis."""
         
@@ -83,10 +110,15 @@ Respond in JSON format:
         ]
         
         try:
-            response = self.llm.invoke(messages)
+            response = await self.llm.ainvoke(
+                messages,
+                temperature=0.1,
+                max_new_tokens=512
+            )
             
-            # Parse JSON response
-            result = json.loads(response)
+            # Parse JSON response, ignoring any text around the object
+            match = _JSON_RE.search(response)
+            result = json.loads(match.group(0) if match else response)
             
             return QueryAnalysisResult(
                 query_type=result.get("query_type", "factual"),
@@ -95,52 +127,60 @@ Respond in JSON format:
                 reasoning=result.get("reasoning", "")
             )
         except Exception as e:
-            print(f"⚠️  LLM analysis failed: {e}, using fallback")
+            logger.warning("LLM analysis failed: %s, using fallback", e)
             return self._rule_based_analysis(query)
     
     def _rule_based_analysis(self, query: str) -> QueryAnalysisResult:
         """Fallback rule-based analysis."""
-        
-        query_lower = query.lower()
-        
-        # Determine query type
-        question_words = ["what", "why", "how", "when", "where", "who"]
-        conversational_words = ["hello", "hi", "thanks", "thank you"]
-        
-        if any(word in query_lower for word in conversational_words):
-            query_type = "conversational"
-        elif any(query_lower.startswith(word) for word in question_words):
-            if "why" in query_lower or "how" in query_lower:
-                query_type = "analytical"
-            else:
-                query_type = "factual"
-        else:
-            query_type = "factual"
-        
-        # Determine if web search is needed
-        current_info_indicators = [
-            "latest", "recent", "current", "today", "now",
-            "2024", "2025", "2026", "this year"
-        ]
-        needs_web_search = any(word in query_lower for word in current_info_indicators)
-        
-        # Extract keywords (simple: remove common words)
-        stop_words = {
-            "what", "is", "the", "a", "an", "in", "on", "at", "to", "for",
-            "of", "and", "or", "but", "with", "from", "by", "about"
-        }
-        
-        words = query_lower.split()
-        keywords = [w for w in words if w not in stop_words and len(w) > 2][:5]
+        query_type, needs_web_search, keywords = _cached_rule_analysis(query.lower())
         
         return QueryAnalysisResult(
             query_type=query_type,
             needs_web_search=needs_web_search,
-            search_keywords=keywords,
+            search_keywords=list(keywords),
             reasoning="Rule-based analysis"
         )
 
 
+def is_small_talk(query: str) -> bool:
+    """
+    Check whether a query is only a greeting or thanks.
+    
+    Such messages need no retrieval. A greeting followed by a real question
+    ("Hello, can you summarize ...") is not small talk.
+    """
+    return _SMALL_TALK_RE.fullmatch(query.lower()) is not None
+
+
+@lru_cache(maxsize=1024)
+def _cached_rule_analysis(query_lower: str) -> Tuple[str, bool, Tuple[str, ...]]:
+    """
+    Classify a lowercased query with keyword rules.
+    
+    Memoized so repeated queries (greetings, common questions) skip the
+    pattern scans.
+    
+    Returns:
+        Tuple of (query_type, needs_web_search, keywords)
+    """
+    # Determine query type
+    if _SMALL_TALK_RE.fullmatch(query_lower):
+        query_type = "conversational"
+    elif _QUESTION_RE.match(query_lower) and _ANALYTICAL_RE.search(query_lower):
+        query_type = "analytical"
+    else:
+        query_type = "factual"
+    
+    # Determine if web search is needed
+    needs_web_search = _CURRENT_RE.search(query_lower) is not None
+    
+    # Extract keywords (simple: remove common words)
+    words = query_lower.split()
+    keywords = tuple(w for w in words if w not in _STOP_WORDS and len(w) > 2)[:5]
+    
+    return query_type, needs_web_search, keywords
+
+
 # Example usage
 if __name__ == "__main__":
     import asyncio
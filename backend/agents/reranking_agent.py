@@ -1,8 +1,22 @@
 """Re-ranking Agent - Re-ranks retrieved documents by relevance."""
 
 from typing import List, Dict
+from collections import OrderedDict
 from backend.agents.state import AgentState
 from backend.services.embedding_service import EmbeddingService
+from backend.config import settings
+import hashlib
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of chunk embeddings kept in the re-ranking cache
+EMBEDDING_CACHE_SIZE = 4096
+
+# Chunk text is cut to this many characters (~500 tokens) before embedding,
+# matching the embedding model's maximum sequence length
+RERANK_MAX_CHARS = 2000
 
 
 class RerankingAgent:
@@ -12,9 +26,15 @@ class RerankingAgent:
     Uses embedding similarity for re-ranking.
     """
     
-    def __init__(self):
-        """Initialize re-ranking agent."""
-        self.embedding_service = EmbeddingService()
+    def __init__(self, embedding_service: EmbeddingService):
+        """
+        Initialize re-ranking agent.
+        
+        Args:
+            embedding_service: Shared embedding service instance
+        """
+        self.embedding_service = embedding_service
+        self._embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
     
     async def rerank(self, state: AgentState) -> AgentState:
         """
@@ -33,48 +53,102 @@ class RerankingAgent:
         state["processing_steps"].append("reranking")
         
         if not chunks:
-            print("⚠️  No chunks to re-rank")
+            logger.debug("No chunks to re-rank")
             state["reranked_chunks"] = []
             return state
         
-        print(f"🔄 Re-ranking {len(chunks)} chunks...")
+        # Nothing can be dropped, so keep the retrieval order and skip embedding
+        if len(chunks) <= settings.reranking_top_k and all(
+            chunk.get('score') is not None for chunk in chunks
+        ):
+            state["reranked_chunks"] = sorted(chunks, key=lambda c: c['score'], reverse=True)
+            logger.debug("Skipping re-rank for %d chunks", len(chunks))
+            return state
         
-        # Generate query embedding
-        query_embedding = self.embedding_service.embed_text(query)
+        logger.info("Re-ranking %d chunks", len(chunks))
         
-        # Calculate relevance scores
-        scored_chunks = []
-        for chunk in chunks:
-            # Get chunk embedding
-            chunk_embedding = self.embedding_service.embed_text(chunk['content'])
-            
-            # Calculate similarity
-            similarity = self.embedding_service.similarity(
-                query_embedding,
-                chunk_embedding
-            )
-            
-            # Combine with existing score (if any)
-            existing_score = chunk.get('score', 0.5)
-            final_score = (similarity * 0.6) + (existing_score * 0.4)
-            
-            scored_chunks.append({
-                **chunk,
-                'rerank_score': final_score,
-                'similarity': similarity
-            })
+        query_embedding, chunk_embeddings = self._get_embeddings(query, chunks)
+        
+        # Embeddings are L2-normalized, so the dot product is cosine similarity
+        similarities = chunk_embeddings @ query_embedding
         
-        # Sort by re-rank score
-        scored_chunks.sort(key=lambda x: x['rerank_score'], reverse=True)
+        # Combine with existing score (if any)
+        existing_scores = np.fromiter(
+            (chunk.get('score', 0.5) for chunk in chunks),
+            dtype=np.float32,
+            count=len(chunks)
+        )
+        final_scores = (similarities * 0.6) + (existing_scores * 0.4)
         
-        # Take top results
-        from backend.config import settings
-        top_chunks = scored_chunks[:settings.reranking_top_k]
+        # Select top results without sorting every candidate
+        k = min(settings.reranking_top_k, len(chunks))
+        if k < len(chunks):
+            top_indices = np.argpartition(-final_scores, k - 1)[:k]
+        else:
+            top_indices = np.arange(len(chunks))
+        top_indices = top_indices[np.argsort(-final_scores[top_indices], kind='stable')]
+        
+        top_chunks = [
+            {
+                **chunks[i],
+                'rerank_score': float(final_scores[i]),
+                'similarity': float(similarities[i])
+            }
+            for i in top_indices
+        ]
         
         state["reranked_chunks"] = top_chunks
         
-        print(f"   ✅ Re-ranked to top {len(top_chunks)} chunks")
+        logger.debug("Re-ranked to top %d chunks", len(top_chunks))
         if top_chunks:
-            print(f"   Top score: {top_chunks[0]['rerank_score']:.4f}")
+            logger.debug("Top score: %.4f", top_chunks[0]['rerank_score'])
         
         return state
+    
+    def _get_embeddings(self, query: str, chunks: List[Dict]):
+        """
+        Get L2-normalized query and chunk embeddings.
+        
+        Chunk embeddings are taken from the vector store when retrieval
+        returned them, then from the content-hash cache; only the remaining
+        misses are embedded, in one batched call. The query embedding comes
+        from ``embed_text``, whose cache the query route and dense search
+        already filled for this query.
+        """
+        chunk_embeddings = np.empty(
+            (len(chunks), self.embedding_service.dimension),
+            dtype=np.float32
+        )
+        missing_indices = []
+        missing_keys = []
+        
+        for i, chunk in enumerate(chunks):
+            stored = chunk.get('embedding')
+            if stored is not None:
+                vec = np.asarray(stored, dtype=np.float32)
+                norm = np.linalg.norm(vec)
+                chunk_embeddings[i] = vec / norm if norm > 0 else vec
+                continue
+            
+            key = hashlib.sha1(chunk['content'].encode('utf-8')).hexdigest()
+            cached = self._embedding_cache.get(key)
+            if cached is not None:
+                self._embedding_cache.move_to_end(key)
+                chunk_embeddings[i] = cached
+            else:
+                missing_indices.append(i)
+                missing_keys.append(key)
+        
+        if missing_indices:
+            texts = [chunks[i]['content'][:RERANK_MAX_CHARS] for i in missing_indices]
+            embeddings = self.embedding_service.embed_texts(texts)
+            
+            for i, key, embedding in zip(missing_indices, missing_keys, embeddings):
+                chunk_embeddings[i] = embedding
+                self._embedding_cache[key] = embedding.copy()  # not a view pinning the batch array
+            
+            while len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        
+        query_embedding = np.asarray(self.embedding_service.embed_text(query), dtype=np.float32)
+        return query_embedding, chunk_embeddings
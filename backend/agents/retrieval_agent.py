@@ -4,6 +4,10 @@ from typing import List, Dict
 from backend.agents.state import AgentState
 from backend.services.hybrid_search import HybridSearch
 from backend.services.web_search import WebSearchService
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class RetrievalAgent:
@@ -22,6 +26,11 @@ class RetrievalAgent:
         """
         self.hybrid_search = hybrid_search
         self.web_search = WebSearchService()
+        
+        # Search parameters are fixed for the agent's lifetime
+        self.top_k = settings.retrieval_top_k
+        self.dense_weight = 0.7
+        self.sparse_weight = 0.3
     
     async def retrieve(self, state: AgentState) -> AgentState:
         """
@@ -39,27 +48,30 @@ class RetrievalAgent:
         # Add processing step
         state["processing_steps"].append("retrieval")
         
-        # Retrieve from vector database
-        print(f"🔍 Retrieving from vector database...")
-        vector_results = await self.hybrid_search.hybrid_search(
-            query=query,
-            top_k=settings.retrieval_top_k,
-            dense_weight=0.7,
-            sparse_weight=0.3
-        )
+        # Retrieve from vector database and, if needed, the web concurrently
+        logger.info("Retrieving from vector database")
+        tasks = [
+            self.hybrid_search.hybrid_search(
+                query=query,
+                top_k=self.top_k,
+                dense_weight=self.dense_weight,
+                sparse_weight=self.sparse_weight
+            )
+        ]
+        if needs_web:
+            logger.info("Retrieving from web")
+            tasks.append(self.web_search.search(query=query, max_results=5))
+        
+        results = await asyncio.gather(*tasks)
+        vector_results = results[0]
         
         state["retrieved_chunks"] = vector_results
-        print(f"   Found {len(vector_results)} chunks from vector DB")
+        logger.debug("Found %d chunks from vector DB", len(vector_results))
         
-        # Retrieve from web if needed
         if needs_web:
-            print(f"🌐 Retrieving from web...")
-            web_results = await self.web_search.search(
-                query=query,
-                max_results=5
-            )
+            web_results = results[1]
             state["web_results"] = web_results
-            print(f"   Found {len(web_results)} web results")
+            logger.debug("Found %d web results", len(web_results))
         else:
             state["web_results"] = []
         
@@ -26,6 +26,7 @@ class AgentState(TypedDict):
     # Retrieved documents
     retrieved_chunks: List[Dict]  # From vector/hybrid search
     web_results: List[Dict]  # From web search (if needed)
+    retrieval_reused: bool  # Retrieval results supplied by the caller (query cache)
     
     # Re-ranked results
     reranked_chunks: List[Dict]
@@ -2,13 +2,35 @@
 
 from langgraph.graph import StateGraph, END
 from backend.agents.state import AgentState
-from backend.agents.query_analysis_agent import QueryAnalysisAgent
+from backend.agents.query_analysis_agent import QueryAnalysisAgent, is_small_talk
 from backend.agents.retrieval_agent import RetrievalAgent
 from backend.agents.reranking_agent import RerankingAgent
 from backend.agents.generation_agent import GenerationAgent
 from backend.agents.citation_agent import CitationAgent
 from backend.services.hybrid_search import HybridSearch
-from typing import Dict
+from backend.services.embedding_service import EmbeddingService
+from typing import AsyncIterator, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default values for every AgentState field; empty collections are immutable
+# tuples so the template can be shallow-copied safely for each run
+_EMPTY_STATE_TEMPLATE = {
+    "messages": (),
+    "query_type": None,
+    "needs_web_search": False,
+    "search_keywords": (),
+    "retrieved_chunks": (),
+    "web_results": (),
+    "retrieval_reused": False,
+    "reranked_chunks": (),
+    "generated_response": None,
+    "citations": (),
+    "final_response": None,
+    "processing_steps": (),
+    "error": None
+}
 
 
 class RAGWorkflow:
@@ -17,19 +39,32 @@ class RAGWorkflow:
     
     Workflow:
     1. Query Analysis → 2. Retrieval → 3. Re-ranking → 4. Generation → 5. Citation
+    
+    Conversational queries go straight from analysis to generation, and
+    re-ranking is skipped when retrieval returns no chunks. Retrieval is
+    also skipped when the caller supplies previous retrieval results.
     """
     
-    def __init__(self, hybrid_search: HybridSearch):
+    def __init__(
+        self,
+        hybrid_search: HybridSearch,
+        embedding_service: Optional[EmbeddingService] = None
+    ):
         """
         Initialize RAG workflow.
         
         Args:
             hybrid_search: Hybrid search service instance
+            embedding_service: Shared embedding service (defaults to the
+                process-wide instance)
         """
+        if embedding_service is None:
+            embedding_service = EmbeddingService()
+        
         # Initialize agents
         self.query_agent = QueryAnalysisAgent()
         self.retrieval_agent = RetrievalAgent(hybrid_search)
-        self.reranking_agent = RerankingAgent()
+        self.reranking_agent = RerankingAgent(embedding_service)
         self.generation_agent = GenerationAgent()
         self.citation_agent = CitationAgent()
         
@@ -52,8 +87,19 @@ class RAGWorkflow:
         # Define edges (workflow flow)
         workflow.set_entry_point("query_analysis")
         
-        workflow.add_edge("query_analysis", "retrieval")
-        workflow.add_edge("retrieval", "reranking")
+        # Conversational queries skip retrieval and re-ranking entirely;
+        # supplied retrieval results go straight to re-ranking
+        workflow.add_conditional_edges(
+            "query_analysis",
+            self._route_after_analysis,
+            {"retrieval": "retrieval", "reranking": "reranking", "generation": "generation"}
+        )
+        # Nothing to re-rank when retrieval found no chunks
+        workflow.add_conditional_edges(
+            "retrieval",
+            self._route_after_retrieval,
+            {"reranking": "reranking", "generation": "generation"}
+        )
         workflow.add_edge("reranking", "generation")
         workflow.add_edge("generation", "citation")
         workflow.add_edge("citation", END)
@@ -61,56 +107,125 @@ class RAGWorkflow:
         # Compile graph
         return workflow.compile()
     
-    async def run(self, query: str, conversation_id: str = None) -> Dict:
+    @staticmethod
+    def _route_after_analysis(state: AgentState) -> str:
+        """Choose the node that follows query analysis."""
+        # Only pure greetings/thanks skip retrieval; "Hi, what does the
+        # report say ..." is conversational in tone but needs documents
+        if state.get("query_type") == "conversational" and is_small_talk(state["query"]):
+            return "generation"
+        if state.get("retrieval_reused"):
+            return RAGWorkflow._route_after_retrieval(state)
+        return "retrieval"
+    
+    @staticmethod
+    def _route_after_retrieval(state: AgentState) -> str:
+        """Choose the node that follows retrieval."""
+        if not state.get("retrieved_chunks"):
+            return "generation"
+        return "reranking"
+    
+    async def run(
+        self,
+        query: str,
+        conversation_id: str = None,
+        retrieved: Optional[Dict] = None
+    ) -> Dict:
         """
         Run the RAG workflow.
         
         Args:
             query: User query
             conversation_id: Optional conversation ID
+            retrieved: Optional earlier retrieval results (``retrieved_chunks``
+                and ``web_results``) to use instead of running retrieval
             
         Returns:
             Final state with response and citations
         """
-        print(f"\n{'='*60}")
-        print(f"🚀 Starting RAG Workflow")
-        print(f"Query: {query}")
-        print(f"{'='*60}\n")
+        logger.info("Starting RAG workflow for query: %s", query)
         
         # Initialize state
-        initial_state = AgentState(
-            query=query,
-            conversation_id=conversation_id,
-            messages=[],
-            query_type=None,
-            needs_web_search=False,
-            search_keywords=[],
-            retrieved_chunks=[],
-            web_results=[],
-            reranked_chunks=[],
-            generated_response=None,
-            citations=[],
-            final_response=None,
-            processing_steps=[],
-            error=None
-        )
+        initial_state = self._initial_state(query, conversation_id, retrieved)
         
         try:
             # Run workflow
             final_state = await self.graph.ainvoke(initial_state)
             
-            print(f"\n{'='*60}")
-            print(f"✅ Workflow Complete")
-            print(f"Processing steps: {' → '.join(final_state['processing_steps'])}")
-            print(f"{'='*60}\n")
+            logger.info(
+                "Workflow complete: %s",
+                " → ".join(final_state["processing_steps"])
+            )
             
             return final_state
             
         except Exception as e:
-            print(f"\n❌ Workflow error: {e}")
+            logger.exception("Workflow error: %s", e)
             initial_state["error"] = str(e)
             return initial_state
     
+    async def stream(
+        self,
+        query: str,
+        conversation_id: str = None,
+        retrieved: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Run the RAG workflow, streaming generated tokens as they arrive.
+        
+        Args:
+            query: User query
+            conversation_id: Optional conversation ID
+            retrieved: Optional earlier retrieval results (see ``run``)
+            
+        Yields:
+            ``{"type": "token", "content": str}`` events during generation,
+            followed by one ``{"type": "final", "state": Dict}`` event
+            (with citations) once the workflow completes
+        """
+        initial_state = self._initial_state(query, conversation_id, retrieved)
+        final_state = initial_state
+        
+        try:
+            async for event in self.graph.astream_events(initial_state, version="v2"):
+                kind = event["event"]
+                
+                if (
+                    kind == "on_llm_stream"
+                    and event.get("metadata", {}).get("langgraph_node") == "generation"
+                ):
+                    chunk = event["data"]["chunk"]
+                    text = getattr(chunk, "text", chunk)
+                    if text:
+                        yield {"type": "token", "content": text}
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    # Root graph run finished
+                    final_state = event["data"]["output"]
+        except Exception as e:
+            logger.exception("Workflow error: %s", e)
+            final_state["error"] = str(e)
+        
+        yield {"type": "final", "state": final_state}
+    
+    def _initial_state(
+        self,
+        query: str,
+        conversation_id: Optional[str],
+        retrieved: Optional[Dict] = None
+    ) -> AgentState:
+        """Build the initial workflow state for a query."""
+        state = _EMPTY_STATE_TEMPLATE.copy()
+        state["query"] = query
+        state["conversation_id"] = conversation_id
+        # Agents append to these, so they need fresh lists per run
+        state["messages"] = []
+        state["processing_steps"] = []
+        if retrieved is not None:
+            state["retrieved_chunks"] = retrieved.get("retrieved_chunks", [])
+            state["web_results"] = retrieved.get("web_results", [])
+            state["retrieval_reused"] = True
+        return state
+    
     def get_workflow_diagram(self) -> str:
         """Get ASCII diagram of the workflow."""
         return """
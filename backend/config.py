@@ -1,9 +1,13 @@
 """Centralized configuration management for the RAG system."""
 
 from pydantic_settings import BaseSettings
+from functools import cached_property
 from typing import List
+import logging
 import os
-import json
+import orjson
+
+logger = logging.getLogger(__name__)
 
 
 class Settings(BaseSettings):
@@ -16,6 +20,11 @@ class Settings(BaseSettings):
     # Embedding Configuration
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     embedding_dimension: int = 384  # for all-MiniLM-L6-v2
+    embedding_backend: str = "sbert"  # "sbert", "onnx" or "onnx-int8" (ONNX Runtime)
+    embedding_onnx_int8_file: str = "onnx/model_quint8_avx2.onnx"  # used by "onnx-int8"
+    embedding_device: str = ""  # e.g. "cuda" or "cpu"; empty picks CUDA when available
+    embedding_fp16: bool = True  # FP16 weights on GPU
+    embedding_quantize: bool = True  # Dynamic int8 linear layers on CPU
     
     # Pinecone Configuration
     pinecone_api_key: str = ""  # Optional for Phase 2 testing
@@ -33,10 +42,20 @@ class Settings(BaseSettings):
     mcp_vector_db_port: int = 8002
     mcp_doc_processor_host: str = "localhost"
     mcp_doc_processor_port: int = 8003
+    # Optional Unix domain socket paths for co-located MCP servers; when set,
+    # the server binds to the socket and the client connects through it
+    mcp_web_search_uds: str = ""
+    mcp_vector_db_uds: str = ""
+    mcp_doc_processor_uds: str = ""
     
     # Data Directories
     upload_dir: str = "./data/uploads"
     conversations_dir: str = "./data/conversations"
+    embedding_cache_path: str = "./data/embedding_cache.db"
+    embedding_cache_quantize: bool = True  # int8 + per-vector scale on disk
+    query_cache_path: str = "./data/query_cache.jsonl"
+    bm25_cache_path: str = "./data/bm25_index"  # empty disables BM25 index persistence
+    bm25_tokenizer: str = "regex"  # "regex" (word characters) or "simple" (whitespace)
     
     # Application Settings
     chunk_size: int = 512
@@ -49,6 +68,7 @@ class Settings(BaseSettings):
     # API Settings
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    debug: bool = False  # adds an X-Process-Time header to every response
     cors_origins: str = '["http://localhost:3000", "http://localhost:8000", "http://localhost:8080", "http://127.0.0.1:8080"]'
     
     class Config:
@@ -56,26 +76,27 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
     
-    @property
+    def ensure_dirs(self):
+        """Create the data directories (call at application startup)."""
+        os.makedirs(self.upload_dir, exist_ok=True)
+        os.makedirs(self.conversations_dir, exist_ok=True)
+    
+    @cached_property
     def cors_origins_list(self) -> List[str]:
-        """Parse CORS origins from JSON string."""
+        """Parse CORS origins from JSON string (parsed once per settings instance)."""
         try:
-            return json.loads(self.cors_origins)
-        except:
+            return orjson.loads(self.cors_origins)
+        except (orjson.JSONDecodeError, TypeError):
             return ["http://localhost:3000", "http://localhost:8000"]
 
 
 # Initialize settings
 settings = Settings()
 
-# Create necessary directories
-os.makedirs(settings.upload_dir, exist_ok=True)
-os.makedirs("./data/conversations", exist_ok=True)
-
-# Print configuration on import (for debugging)
-if __name__ != "__main__":
-    print("🔧 Configuration loaded:")
-    print(f"  📚 LLM Model: {settings.hf_model_name}")
-    print(f"  🔍 Embedding Model: {settings.embedding_model}")
-    print(f"  💾 Vector DB: Pinecone ({settings.pinecone_index_name})")
-    print(f"  📁 Upload Directory: {settings.upload_dir}")
+logger.info(
+    "Configuration loaded: LLM=%s, embeddings=%s, vector DB=Pinecone (%s), uploads=%s",
+    settings.hf_model_name,
+    settings.embedding_model,
+    settings.pinecone_index_name,
+    settings.upload_dir
+)
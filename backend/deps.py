@@ -0,0 +1,34 @@
+"""FastAPI dependencies providing shared application resources."""
+
+from fastapi import Request
+from functools import lru_cache
+from backend.mcp.client import MCPClient
+from backend.services.vector_store import VectorStore
+from backend.services.hybrid_search import HybridSearch
+from backend.agents.workflow import RAGWorkflow
+
+
+def get_mcp(request: Request) -> MCPClient:
+    """Get the application-wide MCP client created in the lifespan handler."""
+    return request.app.state.mcp
+
+
+# The singletons below are created on first use. lru_cache does not cache
+# exceptions, so if Pinecone is unavailable the next call simply retries.
+
+@lru_cache(maxsize=1)
+def get_vector_store() -> VectorStore:
+    """Get the process-wide Pinecone vector store."""
+    return VectorStore()
+
+
+@lru_cache(maxsize=1)
+def get_hybrid_search() -> HybridSearch:
+    """Get the process-wide hybrid search service."""
+    return HybridSearch(get_vector_store())
+
+
+@lru_cache(maxsize=1)
+def get_workflow() -> RAGWorkflow:
+    """Get the process-wide RAG workflow (agents and compiled graph)."""
+    return RAGWorkflow(get_hybrid_search(), get_vector_store().embedding_service)
@@ -2,9 +2,65 @@
 Updated MCP Client to connect to separate MCP servers.
 """
 
+import asyncio
+import logging
 import httpx
-from typing import List, Dict, Optional
+import numpy as np
+import orjson
+from typing import BinaryIO, List, Dict, Optional, Union
 from backend.config import settings
+from backend.services.micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+# Embedding requests are coalesced for this long, up to this many texts
+EMBED_BATCH_WINDOW_SECONDS = 0.005
+EMBED_MAX_BATCH = 128
+
+# Document processing extracts and chunks the whole file server-side
+PROCESS_TIMEOUT = httpx.Timeout(60.0, read=120.0)
+
+# Retries (with exponential backoff) for POSTs that fail to connect
+POST_RETRIES = 2
+POST_BACKOFF_SECONDS = 0.1
+
+# Failures of an MCP call: transport/HTTP status errors or a malformed body
+_MCP_ERRORS = (httpx.HTTPError, orjson.JSONDecodeError)
+
+_POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=32,
+    keepalive_expiry=60
+)
+
+
+def _uds_mounts() -> Dict[str, httpx.AsyncHTTPTransport]:
+    """Route MCP servers configured with a Unix socket through that socket."""
+    servers = [
+        (settings.mcp_web_search_host, settings.mcp_web_search_port, settings.mcp_web_search_uds),
+        (settings.mcp_vector_db_host, settings.mcp_vector_db_port, settings.mcp_vector_db_uds),
+        (settings.mcp_doc_processor_host, settings.mcp_doc_processor_port, settings.mcp_doc_processor_uds),
+    ]
+    return {
+        f"http://{host}:{port}": httpx.AsyncHTTPTransport(uds=uds, limits=_POOL_LIMITS, retries=1)
+        for host, port, uds in servers
+        if uds
+    }
+
+
+# Process-wide HTTP client shared by all MCPClient instances so connections
+# to the MCP servers are kept alive and reused across requests
+_shared_client = httpx.AsyncClient(
+    limits=_POOL_LIMITS,
+    timeout=httpx.Timeout(30.0, connect=5.0),
+    transport=httpx.AsyncHTTPTransport(limits=_POOL_LIMITS, retries=1),
+    mounts=_uds_mounts()
+)
+
+
+async def close_shared_client():
+    """Close the shared HTTP client (call once at application shutdown)."""
+    await _shared_client.aclose()
 
 
 class MCPClient:
@@ -17,13 +73,42 @@ class MCPClient:
     - Document Processing MCP Server (port 8003)
     """
     
-    def __init__(self):
-        """Initialize MCP client with server URLs."""
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize MCP client with server URLs.
+        
+        Args:
+            client: Optional HTTP client; defaults to the shared pooled client
+        """
         self.web_search_url = f"http://{settings.mcp_web_search_host}:{settings.mcp_web_search_port}"
         self.vector_db_url = f"http://{settings.mcp_vector_db_host}:{settings.mcp_vector_db_port}"
         self.doc_processor_url = f"http://{settings.mcp_doc_processor_host}:{settings.mcp_doc_processor_port}"
         
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = client or _shared_client
+        
+        # Embedding micro-batcher (started lazily on first use)
+        self._embed_batcher = MicroBatcher(
+            self._embed_batch, EMBED_BATCH_WINDOW_SECONDS, EMBED_MAX_BATCH
+        )
+    
+    async def _post(self, url: str, **kwargs) -> Dict:
+        """
+        POST to an MCP server and return the parsed JSON body.
+        
+        Connection failures (where the request never reached the server)
+        are retried with exponential backoff; HTTP errors are raised.
+        """
+        for attempt in range(POST_RETRIES + 1):
+            try:
+                response = await self.client.post(url, **kwargs)
+                break
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if attempt == POST_RETRIES:
+                    raise
+                await asyncio.sleep(POST_BACKOFF_SECONDS * 2 ** attempt)
+        
+        response.raise_for_status()
+        return orjson.loads(response.content)
     
     async def search_web(self, query: str, max_results: int = 5) -> List[Dict]:
         """
@@ -37,38 +122,78 @@ class MCPClient:
             List of search results
         """
         try:
-            response = await self.client.post(
+            data = await self._post(
                 f"{self.web_search_url}/search",
                 json={"query": query, "max_results": max_results}
             )
-            response.raise_for_status()
-            data = response.json()
             return data.get("results", [])
-        except Exception as e:
-            print(f"Web search MCP error: {e}")
+        except _MCP_ERRORS:
+            logger.exception("Web search MCP error")
             return []
     
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings using Vector DB MCP Server.
         
+        Concurrent calls arriving within a short window are coalesced into a
+        single /embed request.
+        
         Args:
             texts: List of texts to embed
             
         Returns:
             List of embeddings
         """
+        if not texts:
+            return []
+        
+        return list(await self._embed_batcher.submit(texts))
+    
+    async def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Send one coalesced batch of texts to the /embed endpoint."""
+        try:
+            data = await self._post(f"{self.vector_db_url}/embed", json={"texts": batch})
+            return data.get("embeddings", [])
+        except _MCP_ERRORS:
+            logger.exception("Embedding MCP error")
+            return []
+    
+    async def generate_embeddings_binary(
+        self,
+        texts: List[str],
+        dtype: str = "float16"
+    ) -> np.ndarray:
+        """
+        Generate embeddings via the compact binary endpoint.
+        
+        Args:
+            texts: List of texts to embed
+            dtype: Wire format, "float16" or "int8"
+            
+        Returns:
+            float32 array of shape (len(texts), dimension)
+        """
         try:
             response = await self.client.post(
-                f"{self.vector_db_url}/embed",
+                f"{self.vector_db_url}/embed_bin",
+                params={"dtype": dtype},
                 json={"texts": texts}
             )
             response.raise_for_status()
-            data = response.json()
-            return data.get("embeddings", [])
-        except Exception as e:
-            print(f"Embedding MCP error: {e}")
-            return []
+            
+            count = int(response.headers["X-Count"])
+            dim = int(response.headers["X-Dim"])
+            
+            if dtype == "float16":
+                embeddings = np.frombuffer(response.content, dtype=np.float16)
+                return embeddings.reshape(count, dim).astype(np.float32)
+            
+            scales = np.frombuffer(response.content, dtype=np.float32, count=count)
+            quantized = np.frombuffer(response.content, dtype=np.int8, offset=count * 4)
+            return quantized.reshape(count, dim).astype(np.float32) * scales[:, None]
+        except (httpx.HTTPError, KeyError, ValueError):
+            logger.exception("Binary embedding MCP error")
+            return np.empty((0, settings.embedding_dimension), dtype=np.float32)
     
     async def vector_search(
         self,
@@ -88,15 +213,13 @@ class MCPClient:
             Search results
         """
         try:
-            response = await self.client.post(
+            data = await self._post(
                 f"{self.vector_db_url}/search",
                 json={"query": query, "top_k": top_k, "filter": filter}
             )
-            response.raise_for_status()
-            data = response.json()
             return data.get("results", [])
-        except Exception as e:
-            print(f"Vector search MCP error: {e}")
+        except _MCP_ERRORS:
+            logger.exception("Vector search MCP error")
             return []
     
     async def upsert_vectors(self, chunks: List[Dict]) -> bool:
@@ -110,74 +233,72 @@ class MCPClient:
             Success status
         """
         try:
-            response = await self.client.post(
-                f"{self.vector_db_url}/upsert",
-                json={"chunks": chunks}
-            )
-            response.raise_for_status()
+            await self._post(f"{self.vector_db_url}/upsert", json={"chunks": chunks})
             return True
-        except Exception as e:
-            print(f"Upsert MCP error: {e}")
+        except _MCP_ERRORS:
+            logger.exception("Upsert MCP error")
             return False
     
-    async def process_document(self, file_content: bytes, filename: str) -> Dict:
+    async def process_document(
+        self,
+        file_content: Union[bytes, BinaryIO],
+        filename: str
+    ) -> Dict:
         """
         Process document using Document Processing MCP Server.
         
         Args:
-            file_content: File content bytes
+            file_content: File content bytes, or an open binary file object
+                (streamed in blocks rather than loaded into memory)
             filename: Original filename
             
         Returns:
             Processing result with chunks
         """
         try:
-            files = {"file": (filename, file_content)}
-            response = await self.client.post(
+            return await self._post(
                 f"{self.doc_processor_url}/process",
-                files=files
+                files={"file": (filename, file_content)},
+                timeout=PROCESS_TIMEOUT
             )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Document processing MCP error: {e}")
+        except _MCP_ERRORS:
+            logger.exception("Document processing MCP error")
             return {}
     
     async def health_check(self) -> Dict:
         """
         Check health of all MCP servers.
         
+        The three servers are probed concurrently.
+        
         Returns:
             Dictionary with service status
         """
-        health = {}
-        
-        # Check web search
-        try:
-            response = await self.client.get(f"{self.web_search_url}/health")
-            health['web_search'] = response.json() if response.status_code == 200 else {'status': 'unhealthy'}
-        except:
-            health['web_search'] = {'status': 'unreachable'}
+        web_search, vector_db, doc_processor = await asyncio.gather(
+            self._probe(f"{self.web_search_url}/health"),
+            self._probe(f"{self.vector_db_url}/health"),
+            self._probe(f"{self.doc_processor_url}/health")
+        )
         
-        # Check vector DB
-        try:
-            response = await self.client.get(f"{self.vector_db_url}/health")
-            health['vector_db'] = response.json() if response.status_code == 200 else {'status': 'unhealthy'}
-        except:
-            health['vector_db'] = {'status': 'unreachable'}
-        
-        # Check document processor
+        return {
+            'web_search': web_search,
+            'vector_db': vector_db,
+            'doc_processor': doc_processor
+        }
+    
+    async def _probe(self, url: str) -> Dict:
+        """Probe a single health endpoint."""
         try:
-            response = await self.client.get(f"{self.doc_processor_url}/health")
-            health['doc_processor'] = response.json() if response.status_code == 200 else {'status': 'unhealthy'}
-        except:
-            health['doc_processor'] = {'status': 'unreachable'}
-        
-        return health
+            response = await self.client.get(url)
+            return response.json() if response.status_code == 200 else {'status': 'unhealthy'}
+        except (httpx.HTTPError, ValueError):
+            return {'status': 'unreachable'}
     
     async def close(self):
-        """Close HTTP client."""
-        await self.client.aclose()
+        """Stop the embedding batcher and close HTTP client unless it is the shared one."""
+        await self._embed_batcher.close()
+        if self.client is not _shared_client:
+            await self.client.aclose()
 
 
 # Example usage
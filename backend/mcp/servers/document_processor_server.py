@@ -13,16 +13,22 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
 from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from backend.services.document_processor import DocumentProcessor
 from backend.services.chunking_service import ChunkingService
+from backend.services.process_pool import shutdown_process_pool
+from backend.config import settings
+import asyncio
 import uvicorn
 
 app = FastAPI(
     title="Document Processing MCP Server",
     description="MCP server for document processing operations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Initialize services
@@ -30,6 +36,38 @@ processor = DocumentProcessor()
 chunker = ChunkingService()
 
 
+@app.on_event("startup")
+async def create_data_dirs():
+    """Create the upload directory."""
+    settings.ensure_dirs()
+
+
+@app.on_event("shutdown")
+async def stop_process_pool():
+    """Stop the worker processes used for large PDF extraction."""
+    shutdown_process_pool()
+
+
+@app.on_event("startup")
+async def configure_executor():
+    """Size the default thread pool used for CPU-bound chunking."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=os.cpu_count())
+    )
+
+
+def _chunk_with_statistics(content: str, metadata: Dict) -> Tuple[List[Dict], Dict]:
+    """Chunk content and compute chunk statistics (blocking)."""
+    chunks = chunker.chunk_document(content=content, metadata=metadata)
+    return chunks, chunker.get_chunk_statistics(chunks)
+
+
+async def chunk_in_executor(content: str, metadata: Dict) -> Tuple[List[Dict], Dict]:
+    """Run chunking off the event loop so other requests stay responsive."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _chunk_with_statistics, content, metadata)
+
+
 class ChunkRequest(BaseModel):
     """Chunking request schema."""
     content: str
@@ -76,8 +114,7 @@ async def upload_document(file: UploadFile = File(...)):
         Processed document with metadata
     """
     try:
-        content = await file.read()
-        result = await processor.process_upload(content, file.filename)
+        result = await processor.process_upload_stream(file.file, file.filename)
         
         return {
             "status": "success",
@@ -104,12 +141,7 @@ async def chunk_document(request: ChunkRequest):
         Document chunks
     """
     try:
-        chunks = chunker.chunk_document(
-            content=request.content,
-            metadata=request.metadata
-        )
-        
-        stats = chunker.get_chunk_statistics(chunks)
+        chunks, stats = await chunk_in_executor(request.content, request.metadata)
         
         return ChunkResponse(
             chunks=chunks,
@@ -133,17 +165,11 @@ async def process_and_chunk(file: UploadFile = File(...)):
         Processed chunks
     """
     try:
-        # Upload and extract
-        content = await file.read()
-        result = await processor.process_upload(content, file.filename)
+        # Upload and extract (streamed to disk, not buffered in memory)
+        result = await processor.process_upload_stream(file.file, file.filename)
         
         # Chunk
-        chunks = chunker.chunk_document(
-            content=result['content'],
-            metadata=result['metadata']
-        )
-        
-        stats = chunker.get_chunk_statistics(chunks)
+        chunks, stats = await chunk_in_executor(result['content'], result['metadata'])
         
         return {
             "status": "success",
@@ -198,4 +224,10 @@ async def list_resources():
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8003)
+    # libuv event loop and C HTTP parser; no per-request access log lines
+    server_options = dict(loop="uvloop", http="httptools", log_level="warning", access_log=False)
+    if settings.mcp_doc_processor_uds:
+        # Co-located with the API: serve over a Unix domain socket
+        uvicorn.run(app, uds=settings.mcp_doc_processor_uds, **server_options)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8003, **server_options)
@@ -8,42 +8,140 @@ Run from project root: python -m backend.mcp.servers.vector_db_server
 
 import sys
 import os
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from cachetools import TTLCache
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from backend.services.vector_store import VectorStore
-from backend.services.embedding_service import EmbeddingService
+from backend.services.embedding_service import EmbeddingService, get_embedding_batcher
+import numpy as np
+import orjson
+from backend.config import settings
 import uvicorn
 
+logger = logging.getLogger(__name__)
+
+# Initialize services
+embedding_service = EmbeddingService()
+vector_store = None  # Created at startup, or on first use if that failed
+_vector_store_lock = asyncio.Lock()
+
+
+async def get_vector_store() -> VectorStore:
+    """Get the shared vector store, creating it once on first use."""
+    global vector_store
+    if vector_store is None:
+        async with _vector_store_lock:
+            # Re-check: another request may have created it while we waited
+            if vector_store is None:
+                vector_store = await asyncio.to_thread(VectorStore)
+    return vector_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect to Pinecone at startup so the first request doesn't pay for it."""
+    try:
+        await get_vector_store()
+    except Exception as e:
+        logger.warning("Vector store not initialized at startup: %s", e)
+    yield
+    await get_embedding_batcher().close()
+
+
 app = FastAPI(
     title="Vector Database MCP Server",
     description="MCP server for vector database operations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Initialize services
-embedding_service = EmbeddingService()
-vector_store = None  # Will be initialized when needed
 
+# LRU cache of embeddings keyed by a digest of the input text
+EMBEDDING_CACHE_SIZE = 50_000
+_embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
 
-class EmbedRequest(BaseModel):
-    """Embedding request schema."""
-    texts: List[str]
 
+def embed_with_cache(texts: List[str]) -> np.ndarray:
+    """
+    Embed texts, reusing cached vectors for texts seen before.
+    
+    Only cache misses are sent to the model, in one batch.
+    
+    Returns:
+        float32 array of shape (len(texts), dimension), in input order
+    """
+    result = np.empty((len(texts), embedding_service.dimension), dtype=np.float32)
+    keys = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() for text in texts]
+    
+    missing = {}  # key -> positions in texts
+    for i, key in enumerate(keys):
+        cached = _embedding_cache.get(key)
+        if cached is not None:
+            _embedding_cache.move_to_end(key)
+            result[i] = cached
+        else:
+            missing.setdefault(key, []).append(i)
+    
+    if missing:
+        miss_texts = [texts[positions[0]] for positions in missing.values()]
+        embeddings = embedding_service.embed_batch(miss_texts)
+        for (key, positions), embedding in zip(missing.items(), embeddings):
+            result[positions] = embedding
+            _embedding_cache[key] = embedding.copy()  # not a view pinning the batch array
+        
+        while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+    
+    return result
 
-class EmbedResponse(BaseModel):
-    """Embedding response schema."""
-    embeddings: List[List[float]]
-    dimension: int
 
+# Short-lived cache of search results keyed by (query, top_k, filter);
+# cleared whenever the index is written to
+_search_cache = TTLCache(maxsize=1024, ttl=30)
 
-class UpsertRequest(BaseModel):
-    """Upsert request schema."""
-    chunks: List[Dict]
+
+async def read_json_list(request: Request, field: str, item_type: type) -> List:
+    """
+    Parse a JSON body and return its list-valued ``field``.
+    
+    Hot endpoints use this instead of a Pydantic body model so large
+    payloads are not validated through the model machinery; only the type
+    of each element is checked.
+    
+    Args:
+        request: Incoming request
+        field: Name of the list field
+        item_type: Required type of every element
+        
+    Returns:
+        The list
+    """
+    try:
+        data = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    
+    value = data.get(field) if isinstance(data, dict) else None
+    if not isinstance(value, list):
+        raise HTTPException(status_code=422, detail=f"'{field}' must be a list")
+    if not all(isinstance(item, item_type) for item in value):
+        raise HTTPException(
+            status_code=422,
+            detail=f"'{field}' must contain only {item_type.__name__} elements"
+        )
+    return value
 
 
 class SearchRequest(BaseModel):
@@ -82,23 +180,71 @@ async def health_check():
     }
 
 
-@app.post("/embed", response_model=EmbedResponse)
-async def create_embeddings(request: EmbedRequest):
+@app.post("/embed")
+async def create_embeddings(request: Request):
     """
     Generate embeddings for texts.
     
     Args:
-        request: Embedding request with texts
+        request: Request with JSON body ``{"texts": [...]}``
         
     Returns:
-        Embeddings
+        ``{"embeddings": [[float, ...], ...], "dimension": int}``
     """
+    texts = await read_json_list(request, "texts", str)
+    
     try:
-        embeddings = embedding_service.embed_batch(request.texts)
+        embeddings = embed_with_cache(texts)
+        
+        # orjson serializes the float32 buffer directly (OPT_SERIALIZE_NUMPY)
+        return ORJSONResponse(content={
+            "embeddings": embeddings,
+            "dimension": embedding_service.dimension
+        })
         
-        return EmbedResponse(
-            embeddings=embeddings,
-            dimension=embedding_service.dimension
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/embed_bin")
+async def create_embeddings_binary(request: Request, dtype: str = "float16"):
+    """
+    Generate embeddings and return them as packed binary.
+    
+    Args:
+        request: Request with JSON body ``{"texts": [...]}``
+        dtype: "float16", or "int8" (per-row scaled)
+        
+    Returns:
+        ``application/octet-stream`` body. For float16 it is the row-major
+        (count, dim) matrix. For int8 it is ``count`` float32 row scales
+        followed by the row-major int8 matrix; ``row = q * scale``.
+        Shape and dtype are given in the X-Count, X-Dim and X-Dtype headers.
+    """
+    if dtype not in ("float16", "int8"):
+        raise HTTPException(status_code=400, detail=f"Unsupported dtype: {dtype}")
+    
+    texts = await read_json_list(request, "texts", str)
+    
+    try:
+        embeddings = embed_with_cache(texts)
+        
+        if dtype == "float16":
+            content = embeddings.astype(np.float16).tobytes()
+        else:
+            scales = np.abs(embeddings).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            quantized = np.round(embeddings / scales[:, None]).astype(np.int8)
+            content = scales.astype(np.float32).tobytes() + quantized.tobytes()
+        
+        return Response(
+            content=content,
+            media_type="application/octet-stream",
+            headers={
+                "X-Count": str(embeddings.shape[0]),
+                "X-Dim": str(embeddings.shape[1]),
+                "X-Dtype": dtype
+            }
         )
         
     except Exception as e:
@@ -106,26 +252,28 @@ async def create_embeddings(request: EmbedRequest):
 
 
 @app.post("/upsert")
-async def upsert_chunks(request: UpsertRequest):
+async def upsert_chunks(request: Request):
     """
     Upsert chunks to vector database.
     
     Args:
-        request: Upsert request with chunks
+        request: Request with JSON body ``{"chunks": [...]}``
         
     Returns:
         Success message
     """
+    chunks = await read_json_list(request, "chunks", dict)
+    
     try:
-        global vector_store
-        if not vector_store:
-            vector_store = VectorStore()
+        vector_store = await get_vector_store()
         
-        await vector_store.upsert_chunks(request.chunks)
+        await vector_store.upsert_chunks(chunks)
+        # Cached search results may now be missing the new chunks
+        _search_cache.clear()
         
         return {
             "status": "success",
-            "chunks_upserted": len(request.chunks)
+            "chunks_upserted": len(chunks)
         }
         
     except Exception as e:
@@ -143,16 +291,26 @@ async def search_vectors(request: SearchRequest):
     Returns:
         Search results
     """
+    cache_key = hashlib.blake2b(
+        orjson.dumps(
+            {"q": request.query, "k": request.top_k, "f": request.filter},
+            option=orjson.OPT_SORT_KEYS
+        ),
+        digest_size=16
+    ).digest()
+    results = _search_cache.get(cache_key)
+    if results is not None:
+        return SearchResponse(results=results, total=len(results))
+    
     try:
-        global vector_store
-        if not vector_store:
-            vector_store = VectorStore()
+        vector_store = await get_vector_store()
         
         results = await vector_store.similarity_search(
             query=request.query,
             top_k=request.top_k,
-            filter=request.filter
+            filter_dict=request.filter
         )
+        _search_cache[cache_key] = results
         
         return SearchResponse(
             results=results,
@@ -167,11 +325,11 @@ async def search_vectors(request: SearchRequest):
 async def delete_document(doc_id: str):
     """Delete document from vector database."""
     try:
-        global vector_store
-        if not vector_store:
-            vector_store = VectorStore()
+        vector_store = await get_vector_store()
         
         await vector_store.delete_document(doc_id)
+        # Cached search results may still contain the deleted chunks
+        _search_cache.clear()
         
         return {"status": "success", "doc_id": doc_id}
         
@@ -190,6 +348,12 @@ async def list_resources():
                 "description": "Generate text embeddings",
                 "mimeType": "application/json"
             },
+            {
+                "uri": "vector://embeddings/binary",
+                "name": "Binary Embeddings",
+                "description": "Generate text embeddings as packed float16/int8 bytes",
+                "mimeType": "application/octet-stream"
+            },
             {
                 "uri": "vector://search",
                 "name": "Vector Search",
@@ -207,4 +371,10 @@ async def list_resources():
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    # libuv event loop and C HTTP parser; no per-request access log lines
+    server_options = dict(loop="uvloop", http="httptools", log_level="warning", access_log=False)
+    if settings.mcp_vector_db_uds:
+        # Co-located with the API: serve over a Unix domain socket
+        uvicorn.run(app, uds=settings.mcp_vector_db_uds, **server_options)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8002, **server_options)
@@ -13,20 +13,33 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+from contextlib import asynccontextmanager
 from backend.services.web_search import WebSearchService
+from backend.config import settings
 import uvicorn
 
+# Initialize web search service
+web_search = WebSearchService()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release the outbound search HTTP client on shutdown."""
+    yield
+    await web_search.close()
+
+
 app = FastAPI(
     title="Web Search MCP Server",
     description="MCP server for web search operations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Initialize web search service
-web_search = WebSearchService()
-
 
 class SearchRequest(BaseModel):
     """Search request schema."""
@@ -73,12 +86,12 @@ async def search(request: SearchRequest):
     Returns:
         Search results
     """
+    # WebSearchService caches non-empty results itself
     try:
         results = await web_search.search(
             query=request.query,
             max_results=request.max_results
         )
-        
         return SearchResponse(
             results=results,
             total=len(results),
@@ -111,4 +124,10 @@ async def get_resource(request: SearchRequest):
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    # libuv event loop and C HTTP parser; no per-request access log lines
+    server_options = dict(loop="uvloop", http="httptools", log_level="warning", access_log=False)
+    if settings.mcp_web_search_uds:
+        # Co-located with the API: serve over a Unix domain socket
+        uvicorn.run(app, uds=settings.mcp_web_search_uds, **server_options)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8001, **server_options)
@@ -1,8 +1,9 @@
 """Pydantic schemas for API requests and responses."""
 
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict
 from datetime import datetime
+import os
 
 
 # Document Schemas
@@ -16,6 +17,19 @@ class DocumentUploadResponse(BaseModel):
     message: str = "Document uploaded successfully"
 
 
+class BatchUploadError(BaseModel):
+    """A file that failed during batch upload."""
+    filename: str
+    error: str
+
+
+class BatchUploadResponse(BaseModel):
+    """Response for batch document upload."""
+    documents: List[DocumentUploadResponse]
+    errors: List[BatchUploadError] = Field(default_factory=list)
+    total: int
+
+
 class DocumentInfo(BaseModel):
     """Document information."""
     doc_id: str
@@ -58,7 +72,7 @@ class QueryResponse(BaseModel):
     citations: List[Citation]
     conversation_id: str
     processing_time: float
-    metadata: Dict = Field(default_factory=dict)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
 # Conversation Schemas
@@ -114,3 +128,21 @@ class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
     timestamp: str
+
+
+def warm_schemas():
+    """Build the JSON schema of every API model ahead of the first request."""
+    for model in (
+        DocumentUploadResponse, BatchUploadError, BatchUploadResponse,
+        DocumentInfo, DocumentListResponse,
+        QueryRequest, Citation, QueryResponse,
+        Message, ConversationCreate, ConversationResponse,
+        ConversationDetail, ConversationListResponse,
+        HealthResponse, ErrorResponse
+    ):
+        model.model_json_schema()
+
+
+# Opt-in warm-up (e.g. for a pre-forked production server)
+if os.environ.get("PRECOMPILE_SCHEMAS"):
+    warm_schemas()
@@ -1,13 +1,25 @@
 """API routes for document management."""
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from backend.models.schemas import DocumentUploadResponse, DocumentListResponse, DocumentInfo
-from backend.services.document_processor import DocumentProcessor
-from backend.services.chunking_service import ChunkingService
-from backend.services.vector_store import VectorStore
-from backend.services.hybrid_search import HybridSearch
-from typing import List
+from backend.models.schemas import (
+    BatchUploadError,
+    BatchUploadResponse,
+    DocumentUploadResponse,
+    DocumentListResponse,
+    DocumentInfo
+)
+from backend.services.document_processor import DocumentProcessor, chunk_pdf_file
+from backend.services.chunking_service import ChunkBatch, ChunkingService
+from backend.deps import get_hybrid_search, get_vector_store
+from backend.services.query_cache import get_query_cache
+from backend.services.process_pool import get_process_pool
+from typing import Dict, List, Tuple
+import asyncio
+import logging
 import time
+import uuid
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
@@ -15,6 +27,52 @@ router = APIRouter(prefix="/documents", tags=["documents"])
 processor = DocumentProcessor()
 chunker = ChunkingService()
 
+# Files extracted and chunked concurrently by /upload/batch
+BATCH_UPLOAD_CONCURRENCY = 4
+
+
+async def chunk_in_pool(content: str, metadata: Dict) -> ChunkBatch:
+    """
+    Chunk a document in the shared worker process pool.
+    
+    Chunking is CPU-bound; worker processes let concurrent uploads chunk in
+    parallel and keep the event loop responsive.
+    """
+    loop = asyncio.get_running_loop()
+    # The columnar ChunkBatch is much cheaper to send back than a list of dicts
+    return await loop.run_in_executor(
+        get_process_pool(), chunker.chunk_document_batch, content, metadata
+    )
+
+
+async def extract_and_chunk(file: UploadFile) -> Tuple[Dict, ChunkBatch]:
+    """
+    Store, extract and chunk an uploaded document.
+    
+    PDFs are extracted page by page inside the chunking worker, so the
+    whole document text is never held in memory at once.
+    
+    Args:
+        file: Uploaded file
+        
+    Returns:
+        Tuple of (document metadata, chunks)
+    """
+    if file.filename.lower().endswith('.pdf'):
+        metadata = await processor.save_upload_stream(file.file, file.filename)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_process_pool(), chunk_pdf_file, chunker, metadata['file_path'], metadata
+        )
+    
+    result = await processor.process_upload_stream(file.file, file.filename)
+    return result['metadata'], await chunk_in_pool(result['content'], result['metadata'])
+
+
+async def add_to_bm25(records: List[Dict]):
+    """Add chunk records to the BM25 index (rebuilt in a worker thread)."""
+    await asyncio.to_thread(get_hybrid_search().add_to_bm25, records)
+
 
 @router.post("/upload", response_model=DocumentUploadResponse)
 async def upload_document(file: UploadFile = File(...)):
@@ -24,29 +82,27 @@ async def upload_document(file: UploadFile = File(...)):
     Supports: .txt, .md, .pdf
     """
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Process document
-        result = await processor.process_upload(content, file.filename)
-        
-        # Chunk document
-        chunks = chunker.chunk_document(result['content'], result['metadata'])
+        # Process and chunk document (streamed to disk, not buffered in memory)
+        metadata, chunks = await extract_and_chunk(file)
         
-        # Add to vector store
+        # Add to vector store and the BM25 index
         try:
-            vector_store = VectorStore()
-            await vector_store.add_chunks(chunks)
+            vector_store = get_vector_store()
+            records = chunks.to_records()
+            await vector_store.add_chunks(records)
+            await add_to_bm25(records)
+            # Cached answers may not reflect the new document
+            get_query_cache().clear()
         except Exception as e:
-            print(f"Warning: Failed to add chunks to vector store: {e}")
+            logger.warning("Failed to add chunks to vector store: %s", e)
             # Continue even if vector store fails, so we don't break the upload flow
         
         return DocumentUploadResponse(
-            doc_id=result['metadata']['doc_id'],
-            filename=result['metadata']['filename'],
-            file_type=result['metadata']['file_type'],
+            doc_id=metadata['doc_id'],
+            filename=metadata['filename'],
+            file_type=metadata['file_type'],
             chunks_created=len(chunks),
-            upload_timestamp=result['metadata']['upload_timestamp']
+            upload_timestamp=metadata['upload_timestamp']
         )
         
     except ValueError as e:
@@ -55,6 +111,78 @@ async def upload_document(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
+@router.post("/upload/batch", response_model=BatchUploadResponse)
+async def upload_documents_batch(files: List[UploadFile] = File(...)):
+    """
+    Upload and process several documents concurrently.
+    
+    Files are extracted and chunked in parallel (bounded by
+    BATCH_UPLOAD_CONCURRENCY); each file's chunks are added to the vector
+    store as soon as that file is ready, while the others are still being
+    processed.
+    
+    Supports: .txt, .md, .pdf
+    """
+    semaphore = asyncio.Semaphore(BATCH_UPLOAD_CONCURRENCY)
+    
+    async def process_file(file: UploadFile) -> Tuple[Dict, ChunkBatch]:
+        async with semaphore:
+            return await extract_and_chunk(file)
+    
+    tasks = [asyncio.create_task(process_file(file)) for file in files]
+    
+    try:
+        vector_store = get_vector_store()
+    except Exception as e:
+        logger.warning("Vector store unavailable, skipping indexing: %s", e)
+        vector_store = None
+    
+    documents = []
+    indexed: List[Dict] = []
+    
+    for task in asyncio.as_completed(tasks):
+        try:
+            metadata, chunks = await task
+        except Exception:
+            # Reported per file below
+            continue
+        
+        if vector_store is not None:
+            try:
+                records = chunks.to_records()
+                await vector_store.add_chunks(records)
+                indexed.extend(records)
+            except Exception as e:
+                logger.warning("Failed to add chunks to vector store: %s", e)
+        
+        documents.append(DocumentUploadResponse(
+            doc_id=metadata['doc_id'],
+            filename=metadata['filename'],
+            file_type=metadata['file_type'],
+            chunks_created=len(chunks),
+            upload_timestamp=metadata['upload_timestamp']
+        ))
+    
+    if indexed:
+        # One BM25 rebuild for the whole batch rather than one per file
+        try:
+            await add_to_bm25(indexed)
+        except Exception as e:
+            logger.warning("Failed to add chunks to BM25 index: %s", e)
+    
+    if documents:
+        # Cached answers may not reflect the new documents
+        get_query_cache().clear()
+    
+    errors = [
+        BatchUploadError(filename=file.filename, error=str(task.exception()))
+        for file, task in zip(files, tasks)
+        if task.exception() is not None
+    ]
+    
+    return BatchUploadResponse(documents=documents, errors=errors, total=len(documents))
+
+
 @router.get("/", response_model=DocumentListResponse)
 async def list_documents():
     """List all uploaded documents."""
@@ -66,10 +194,29 @@ async def list_documents():
 @router.delete("/{doc_id}")
 async def delete_document(doc_id: str):
     """Delete a document and its chunks."""
-    # TODO: Implement document deletion
-    # - Delete from vector store
-    # - Delete file from disk
-    # - Update database
+    try:
+        # Document IDs are UUIDs; anything else can't name a stored upload
+        uuid.UUID(doc_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    try:
+        deleted = await get_vector_store().delete_document(doc_id)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Vector store unavailable: {e}")
+    if not deleted:
+        raise HTTPException(status_code=500, detail="Failed to delete document chunks")
+    
+    await asyncio.to_thread(get_hybrid_search().remove_from_bm25, doc_id)
+    
+    # Stored uploads are named "{doc_id}_{filename}"
+    for file_path in processor.upload_dir.glob(f"{doc_id}_*"):
+        processor.delete_document(str(file_path))
+    
+    # Cached answers may cite the deleted document
+    get_query_cache().clear()
+    
+    # TODO: Update database once document metadata is persisted
     
     return {"message": f"Document {doc_id} deleted successfully"}
 
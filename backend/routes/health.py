@@ -1,19 +1,17 @@
 """API routes for health checks and system status."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from backend.models.schemas import HealthResponse
 from backend.config import settings
 from backend.mcp.client import MCPClient
+from backend.deps import get_mcp
 from datetime import datetime
 
 router = APIRouter(prefix="/health", tags=["health"])
 
-# Initialize MCP client
-mcp_client = MCPClient()
-
 
 @router.get("/", response_model=HealthResponse)
-async def health_check():
+async def health_check(mcp_client: MCPClient = Depends(get_mcp)):
     """
     Health check endpoint.
     
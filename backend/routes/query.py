@@ -1,11 +1,15 @@
 """API routes for query processing."""
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from backend.models.schemas import QueryRequest, QueryResponse, Citation
-from backend.agents.workflow import RAGWorkflow
 from backend.services.conversation_manager import ConversationManager
-from backend.services.hybrid_search import HybridSearch
-from backend.services.vector_store import VectorStore
+from backend.deps import get_workflow
+from backend.services.embedding_service import EmbeddingService
+from backend.services.query_cache import get_query_cache, RESPONSE_SIMILARITY_THRESHOLD
+import asyncio
+import json
+import numpy as np
 import time
 from datetime import datetime
 
@@ -15,6 +19,17 @@ router = APIRouter(prefix="/query", tags=["query"])
 conversation_manager = ConversationManager()
 
 
+async def embed_query(query: str):
+    """
+    Compute the normalized query embedding used for cache lookups.
+    
+    Goes through ``embed_text``'s cache, so dense search and re-ranking
+    reuse this embedding instead of encoding the query again.
+    """
+    embedding = await asyncio.to_thread(EmbeddingService().embed_text, query)
+    return np.asarray(embedding, dtype=np.float32)
+
+
 @router.post("/", response_model=QueryResponse)
 async def process_query(request: QueryRequest):
     """
@@ -43,19 +58,43 @@ async def process_query(request: QueryRequest):
             content=request.query
         )
         
+        cache_status = "miss"
+        
         # Initialize workflow
         try:
-            vector_store = VectorStore()
-            hybrid_search = HybridSearch(vector_store)
-            workflow = RAGWorkflow(hybrid_search)
+            # Repeated or near-identical queries are answered from the cache;
+            # similar ones reuse cached retrieval results
+            query_cache = get_query_cache()
+            query_embedding = await embed_query(request.query)
+            cached, similarity = query_cache.lookup(request.query, query_embedding)
             
-            # Run workflow
-            result = await workflow.run(request.query, conversation_id)
-            
-            # Extract response from final state
-            # Note: The key is 'final_response' or 'generated_response'
-            response_text = result.get("final_response") or result.get("generated_response", "No response generated.")
-            citations_list = result.get("citations", [])
+            if cached is not None and similarity >= RESPONSE_SIMILARITY_THRESHOLD:
+                cache_status = "response"
+                response_text = cached['response']
+                citations_list = cached['citations']
+            else:
+                if cached is not None:
+                    cache_status = "retrieval"
+                
+                workflow = get_workflow()
+                
+                # Run workflow
+                result = await workflow.run(request.query, conversation_id, retrieved=cached)
+                
+                # Extract response from final state
+                # Note: The key is 'final_response' or 'generated_response'
+                response_text = result.get("final_response") or result.get("generated_response", "No response generated.")
+                citations_list = result.get("citations", [])
+                
+                if not result.get("error"):
+                    query_cache.store(
+                        request.query,
+                        query_embedding,
+                        response_text,
+                        citations_list,
+                        result.get("retrieved_chunks", []),
+                        result.get("web_results", [])
+                    )
             
         except Exception as e:
             print(f"Workflow error: {e}")
@@ -81,9 +120,85 @@ async def process_query(request: QueryRequest):
             processing_time=processing_time,
             metadata={
                 "status": "success",
+                "cache": cache_status,
                 "note": "Full workflow requires Pinecone configuration"
             }
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Query processing failed: {str(e)}")
+
+
+@router.post("/stream")
+async def stream_query(request: QueryRequest):
+    """
+    Process a query, streaming the response as newline-delimited JSON.
+    
+    Emits ``{"type": "token", "content": ...}`` lines while the answer is
+    generated, then a single ``{"type": "done", ...}`` line carrying the
+    final response with citations.
+    """
+    # Create or get conversation
+    conversation_id = request.conversation_id or conversation_manager.create_conversation()
+    
+    conversation_manager.add_message(
+        conversation_id,
+        role="user",
+        content=request.query
+    )
+    
+    async def event_stream():
+        start_time = time.time()
+        response_text = "No response generated."
+        citations_list = []
+        
+        try:
+            query_cache = get_query_cache()
+            query_embedding = await embed_query(request.query)
+            cached, similarity = query_cache.lookup(request.query, query_embedding)
+            
+            if cached is not None and similarity >= RESPONSE_SIMILARITY_THRESHOLD:
+                response_text = cached['response']
+                citations_list = cached['citations']
+            else:
+                workflow = get_workflow()
+                
+                async for event in workflow.stream(request.query, conversation_id, retrieved=cached):
+                    if event["type"] == "token":
+                        yield json.dumps(event) + "\n"
+                    else:
+                        result = event["state"]
+                        response_text = result.get("final_response") or result.get("generated_response") or response_text
+                        citations_list = result.get("citations", [])
+                
+                if not result.get("error"):
+                    query_cache.store(
+                        request.query,
+                        query_embedding,
+                        response_text,
+                        citations_list,
+                        result.get("retrieved_chunks", []),
+                        result.get("web_results", [])
+                    )
+        except Exception as e:
+            print(f"Workflow error: {e}")
+            response_text = f"I encountered an error processing your query: {str(e)}"
+            citations_list = []
+        
+        conversation_manager.add_message(
+            conversation_id,
+            role="assistant",
+            content=response_text,
+            citations=citations_list
+        )
+        
+        yield json.dumps({
+            "type": "done",
+            "query": request.query,
+            "response": response_text,
+            "citations": [Citation(**c).model_dump() for c in citations_list],
+            "conversation_id": conversation_id,
+            "processing_time": time.time() - start_time
+        }) + "\n"
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
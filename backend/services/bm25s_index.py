@@ -0,0 +1,129 @@
+"""BM25 index with scores precomputed into a sparse matrix (BM25S)."""
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Sequence
+import numpy as np
+import orjson
+from scipy import sparse
+
+# Arrays of the score matrix, each saved as its own .npy file so it can be memory-mapped
+_MATRIX_ARRAYS = ('data', 'indices', 'indptr')
+
+
+class BM25SIndex:
+    """
+    Okapi BM25 with eager scoring.
+    
+    The BM25 contribution of every (document, term) pair is computed once at
+    index time and stored in a CSC matrix with one column per vocabulary
+    term. Scoring a query is then a sum over the query terms' columns
+    instead of a Python loop over every document.
+    """
+    
+    def __init__(self, tokenized_corpus: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index.
+        
+        Args:
+            tokenized_corpus: Tokens of each document
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.vocab: Dict[str, int] = {}
+        
+        doc_ids = []
+        term_ids = []
+        term_freqs = []
+        
+        for doc_id, tokens in enumerate(tokenized_corpus):
+            for token, freq in Counter(tokens).items():
+                doc_ids.append(doc_id)
+                term_ids.append(self.vocab.setdefault(token, len(self.vocab)))
+                term_freqs.append(freq)
+        
+        n_docs = len(tokenized_corpus)
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        tf = np.asarray(term_freqs, dtype=np.float32)
+        
+        doc_len = np.fromiter((len(tokens) for tokens in tokenized_corpus), dtype=np.float32, count=n_docs)
+        avgdl = float(doc_len.mean()) if n_docs else 0.0
+        
+        # Each (doc, term) pair occurs once, so counting term ids gives document frequency
+        df = np.bincount(term_ids, minlength=len(self.vocab)).astype(np.float32)
+        idf = np.log((n_docs - df + 0.5) / (df + 0.5) + 1.0)
+        
+        length_norm = 1.0 - b + b * doc_len[doc_ids] / (avgdl or 1.0)
+        scores = idf[term_ids] * tf * (k1 + 1.0) / (tf + k1 * length_norm)
+        
+        self.matrix = sparse.csc_matrix(
+            (scores.astype(np.float32), (doc_ids, term_ids)),
+            shape=(n_docs, len(self.vocab))
+        )
+    
+    def get_scores(self, query_tokens: Sequence[str]) -> np.ndarray:
+        """
+        Score every document against a query.
+        
+        Args:
+            query_tokens: Query tokens (tokenized like the corpus)
+            
+        Returns:
+            float32 array of BM25 scores, one per document
+        """
+        term_ids = [self.vocab[token] for token in query_tokens if token in self.vocab]
+        if not term_ids:
+            return np.zeros(self.matrix.shape[0], dtype=np.float32)
+        
+        return np.asarray(self.matrix[:, term_ids].sum(axis=1, dtype=np.float32)).ravel()
+    
+    def save(self, directory: str):
+        """
+        Save the index to a directory.
+        
+        Args:
+            directory: Target directory (created if missing)
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        
+        for name in _MATRIX_ARRAYS:
+            np.save(path / f"{name}.npy", getattr(self.matrix, name))
+        
+        (path / "vocab.json").write_bytes(orjson.dumps({
+            'k1': self.k1,
+            'b': self.b,
+            'shape': list(self.matrix.shape),
+            'vocab': self.vocab
+        }))
+    
+    @classmethod
+    def load(cls, directory: str) -> "BM25SIndex":
+        """
+        Load an index saved with ``save``.
+        
+        The score matrix arrays are memory-mapped rather than read, so
+        loading takes roughly constant time regardless of corpus size.
+        
+        Args:
+            directory: Directory written by ``save``
+            
+        Returns:
+            Loaded index
+        """
+        path = Path(directory)
+        meta = orjson.loads((path / "vocab.json").read_bytes())
+        
+        index = cls.__new__(cls)
+        index.k1 = meta['k1']
+        index.b = meta['b']
+        index.vocab = meta['vocab']
+        index.matrix = sparse.csc_matrix(
+            tuple(np.load(path / f"{name}.npy", mmap_mode='r') for name in _MATRIX_ARRAYS),
+            shape=tuple(meta['shape']),
+            copy=False
+        )
+        return index
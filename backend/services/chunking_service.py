@@ -1,22 +1,194 @@
 """Intelligent document chunking service with metadata preservation."""
 
-from typing import List, Dict
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from typing import Iterable, List, Dict, Tuple
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
 from backend.config import settings
+import numpy as np
 import re
 
+# Page markers inserted by DocumentProcessor during PDF extraction
+_PAGE_RE = re.compile(r'\[Page (\d+)\]\n')
+
+# Chunks shorter than this (after stripping) are treated as noise
+MIN_CHUNK_LENGTH = 10
+
+# Split points, from most to least preferred
+_BOUNDARY_RE = re.compile(r'\n\n|\n|[.!?] |[;:] | ')
+_BOUNDARY_RANKS = {'\n\n': 0, '\n': 1, '. ': 2, '! ': 2, '? ': 2, '; ': 3, ': ': 3, ' ': 4}
+
+
+class RegexTextSplitter:
+    """
+    Split text into overlapping chunks at natural boundaries.
+    
+    All candidate boundaries (paragraph breaks, line breaks, sentence ends,
+    clause ends, spaces) are found in a single regex scan. Each chunk then
+    ends at the most preferred boundary in the second half of its window,
+    falling back to a hard cut when the window contains no boundary.
+    """
+    
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        """
+        Initialize splitter.
+        
+        Args:
+            chunk_size: Maximum chunk length in characters
+            chunk_overlap: Characters shared between consecutive chunks
+        """
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+    
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split text into chunks.
+        
+        Args:
+            text: Text to split
+            
+        Returns:
+            List of stripped, non-empty chunks
+        """
+        # Boundary offsets (end of each separator), overall and per rank
+        boundaries = []
+        ranked = [[] for _ in range(max(_BOUNDARY_RANKS.values()) + 1)]
+        for match in _BOUNDARY_RE.finditer(text):
+            boundaries.append(match.end())
+            ranked[_BOUNDARY_RANKS[match.group()]].append(match.end())
+        
+        chunks = []
+        start = 0
+        length = len(text)
+        
+        while start < length:
+            limit = start + self.chunk_size
+            
+            if limit >= length:
+                end = length
+            else:
+                end = self._find_split(ranked, start, limit)
+            
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            
+            if end >= length:
+                break
+            
+            # Begin the next chunk at the first boundary inside the overlap
+            i = bisect_left(boundaries, end - self.chunk_overlap)
+            next_start = boundaries[i] if i < len(boundaries) else end
+            start = next_start if start < next_start < end else end
+        
+        return chunks
+    
+    def _find_split(self, ranked: List[List[int]], start: int, limit: int) -> int:
+        """Pick the split point for the window ``(start, limit]``."""
+        half = start + self.chunk_size // 2
+        fallback = start
+        
+        for offsets in ranked:
+            i = bisect_right(offsets, limit)
+            if i and offsets[i - 1] > start:
+                if offsets[i - 1] >= half:
+                    return offsets[i - 1]
+                fallback = max(fallback, offsets[i - 1])
+        
+        # No well-placed boundary: take the latest one, or cut hard
+        return fallback if fallback > start else limit
+
+
+def _filter_small(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find chunks long enough to keep (shorter ones are likely noise).
+    
+    Args:
+        texts: Stripped chunk texts
+        
+    Returns:
+        Tuple of (positions of kept chunks, lengths of all chunks)
+    """
+    sizes = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    return np.flatnonzero(sizes >= MIN_CHUNK_LENGTH), sizes
+
+
+@dataclass
+class ChunkBatch:
+    """
+    Chunks of one document in struct-of-arrays form.
+    
+    Chunk texts are kept in one list and per-chunk numbers in NumPy arrays,
+    avoiding a nested dict per chunk; ``to_records`` builds the dict form
+    only where it is needed (e.g. for the vector store).
+    """
+    doc_id: str
+    filename: str
+    file_type: str
+    upload_timestamp: str
+    contents: List[str]
+    page_numbers: np.ndarray  # 0 = no page (plain text)
+    chunk_indices: np.ndarray
+    sizes: np.ndarray
+    total_chunks: int
+    
+    def __len__(self) -> int:
+        return len(self.contents)
+    
+    def to_records(self) -> List[Dict]:
+        """
+        Convert to the per-chunk dict format.
+        
+        Returns:
+            List of chunks with 'chunk_id', 'content' and 'metadata'
+        """
+        doc_id = self.doc_id
+        filename = self.filename
+        file_type = self.file_type
+        total_chunks = self.total_chunks
+        upload_timestamp = self.upload_timestamp
+        
+        return [
+            {
+                'chunk_id': f"{doc_id}_chunk_{chunk_index}",
+                'content': content,
+                'metadata': {
+                    'doc_id': doc_id,
+                    'filename': filename,
+                    'file_type': file_type,
+                    'chunk_index': chunk_index,
+                    'page_number': page_number or None,
+                    'total_chunks': total_chunks,
+                    'upload_timestamp': upload_timestamp
+                }
+            }
+            for content, page_number, chunk_index in zip(
+                self.contents,
+                self.page_numbers.tolist(),
+                self.chunk_indices.tolist()
+            )
+        ]
+    
+    def get_stats(self) -> Dict:
+        """Chunk size statistics (same keys as ChunkingService.get_chunk_stats)."""
+        if not self.contents:
+            return {'total_chunks': 0, 'avg_chunk_size': 0, 'min_chunk_size': 0, 'max_chunk_size': 0}
+        
+        return {
+            'total_chunks': len(self.contents),
+            'avg_chunk_size': int(self.sizes.sum()) // len(self.contents),
+            'min_chunk_size': int(self.sizes.min()),
+            'max_chunk_size': int(self.sizes.max())
+        }
+
 
 class ChunkingService:
     """Intelligent document chunking with metadata preservation."""
     
     def __init__(self):
         """Initialize chunking service with configurable parameters."""
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.text_splitter = RegexTextSplitter(
             chunk_size=settings.chunk_size,
-            chunk_overlap=settings.chunk_overlap,
-            separators=["\n\n", "\n", ". ", "! ", "? ", "; ", ": ", " ", ""],
-            length_function=len,
-            is_separator_regex=False,
+            chunk_overlap=settings.chunk_overlap
         )
     
     def chunk_document(self, content: str, metadata: Dict) -> List[Dict]:
@@ -30,109 +202,122 @@ class ChunkingService:
         Returns:
             List of chunks with metadata
         """
-        chunks = []
+        return self.chunk_document_batch(content, metadata).to_records()
+    
+    def chunk_document_batch(self, content: str, metadata: Dict) -> ChunkBatch:
+        """
+        Split document into chunks, returned in columnar form.
         
+        Args:
+            content: Document text content
+            metadata: Document metadata
+            
+        Returns:
+            ChunkBatch holding the chunk texts and per-chunk arrays
+        """
         # Extract page information if present (from PDF)
-        page_pattern = r'\[Page (\d+)\]\n'
-        sections = re.split(page_pattern, content)
+        sections = _PAGE_RE.split(content)
         
         if len(sections) > 1:
-            # PDF with page markers
-            chunks = self._chunk_with_pages(sections, metadata)
-        else:
-            # Plain text without page markers
-            chunks = self._chunk_plain_text(content, metadata)
+            # PDF with page markers; sections format:
+            # ['', '1', 'page 1 text', '2', 'page 2 text', ...]
+            pages = (
+                (int(sections[i]), sections[i + 1])
+                for i in range(1, len(sections) - 1, 2)
+            )
+            return self.chunk_pages(pages, metadata)
         
-        return chunks
+        # Plain text without page markers
+        return self._make_batch(metadata, *self._chunk_plain_text(content))
+    
+    @staticmethod
+    def _make_batch(
+        metadata: Dict,
+        contents: List[str],
+        page_numbers: np.ndarray,
+        chunk_indices: np.ndarray,
+        sizes: np.ndarray,
+        total_chunks: int
+    ) -> ChunkBatch:
+        """Assemble a ChunkBatch for a document."""
+        return ChunkBatch(
+            doc_id=metadata['doc_id'],
+            filename=metadata['filename'],
+            file_type=metadata['file_type'],
+            upload_timestamp=metadata['upload_timestamp'],
+            contents=contents,
+            page_numbers=page_numbers,
+            chunk_indices=chunk_indices,
+            sizes=sizes,
+            total_chunks=total_chunks
+        )
     
-    def _chunk_with_pages(self, sections: List[str], metadata: Dict) -> List[Dict]:
+    def chunk_pages(self, pages: Iterable[Tuple[int, str]], metadata: Dict) -> ChunkBatch:
         """
-        Chunk PDF content preserving page numbers.
+        Chunk a document supplied page by page.
+        
+        Pages are split as they arrive, so the full document text is never
+        assembled (see ``document_processor.chunk_pdf_file``).
         
         Args:
-            sections: List of page sections from regex split
+            pages: Iterable of (page number, page text)
             metadata: Document metadata
             
         Returns:
-            List of chunks with page number metadata
+            ChunkBatch with page number metadata
         """
-        chunks = []
-        chunk_index = 0
-        
-        # sections format: ['', '1', 'page 1 text', '2', 'page 2 text', ...]
-        for i in range(1, len(sections), 2):
-            if i + 1 < len(sections):
-                page_num = int(sections[i])
-                page_text = sections[i + 1].strip()
-                
-                # Skip empty pages
-                if not page_text or page_text == "[No text content]":
-                    continue
-                
-                # Split page text into chunks
-                page_chunks = self.text_splitter.split_text(page_text)
-                
-                for chunk_text in page_chunks:
-                    # Skip very small chunks (likely noise)
-                    if len(chunk_text.strip()) < 10:
-                        continue
-                    
-                    chunks.append({
-                        'chunk_id': f"{metadata['doc_id']}_chunk_{chunk_index}",
-                        'content': chunk_text.strip(),
-                        'metadata': {
-                            'doc_id': metadata['doc_id'],
-                            'filename': metadata['filename'],
-                            'file_type': metadata['file_type'],
-                            'chunk_index': chunk_index,
-                            'page_number': page_num,
-                            'total_chunks': None,  # Will update later
-                            'upload_timestamp': metadata['upload_timestamp']
-                        }
-                    })
-                    chunk_index += 1
-        
-        # Update total chunks count
-        total = len(chunks)
-        for chunk in chunks:
-            chunk['metadata']['total_chunks'] = total
+        texts = []
+        page_numbers = []
         
-        return chunks
+        for page_num, page_text in pages:
+            page_text = page_text.strip()
+            
+            # Skip empty pages
+            if not page_text or page_text == "[No text content]":
+                continue
+            
+            # split_text already returns stripped chunks
+            page_chunks = self.text_splitter.split_text(page_text)
+            texts.extend(page_chunks)
+            page_numbers.extend([page_num] * len(page_chunks))
+        
+        keep, sizes = _filter_small(texts)
+        contents = [texts[i] for i in keep.tolist()]
+        
+        return self._make_batch(
+            metadata,
+            contents,
+            np.asarray(page_numbers, dtype=np.int32)[keep],
+            np.arange(len(contents), dtype=np.int32),
+            sizes[keep],
+            len(contents)
+        )
     
-    def _chunk_plain_text(self, content: str, metadata: Dict) -> List[Dict]:
+    def _chunk_plain_text(
+        self,
+        content: str
+    ) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, int]:
         """
         Chunk plain text files.
         
         Args:
             content: Text content
-            metadata: Document metadata
             
         Returns:
-            List of chunks without page numbers
+            Tuple of (chunk texts, page numbers (all 0), chunk indices, sizes, total chunks)
         """
-        chunks = []
-        text_chunks = self.text_splitter.split_text(content)
+        # split_text already returns stripped chunks
+        texts = self.text_splitter.split_text(content)
         
-        for idx, chunk_text in enumerate(text_chunks):
-            # Skip very small chunks
-            if len(chunk_text.strip()) < 10:
-                continue
-            
-            chunks.append({
-                'chunk_id': f"{metadata['doc_id']}_chunk_{idx}",
-                'content': chunk_text.strip(),
-                'metadata': {
-                    'doc_id': metadata['doc_id'],
-                    'filename': metadata['filename'],
-                    'file_type': metadata['file_type'],
-                    'chunk_index': idx,
-                    'page_number': None,
-                    'total_chunks': len(text_chunks),
-                    'upload_timestamp': metadata['upload_timestamp']
-                }
-            })
+        keep, sizes = _filter_small(texts)
         
-        return chunks
+        return (
+            [texts[i] for i in keep.tolist()],
+            np.zeros(len(keep), dtype=np.int32),
+            keep.astype(np.int32),
+            sizes[keep],
+            len(texts)
+        )
     
     def get_chunk_stats(self, chunks: List[Dict]) -> Dict:
         """
@@ -152,15 +337,24 @@ class ChunkingService:
                 'max_chunk_size': 0
             }
         
-        chunk_sizes = [len(chunk['content']) for chunk in chunks]
+        chunk_sizes = self._chunk_sizes(chunks)
         
         return {
             'total_chunks': len(chunks),
-            'avg_chunk_size': sum(chunk_sizes) // len(chunk_sizes),
-            'min_chunk_size': min(chunk_sizes),
-            'max_chunk_size': max(chunk_sizes)
+            'avg_chunk_size': int(chunk_sizes.sum()) // len(chunks),
+            'min_chunk_size': int(chunk_sizes.min()),
+            'max_chunk_size': int(chunk_sizes.max())
         }
     
+    @staticmethod
+    def _chunk_sizes(chunks: List[Dict]) -> np.ndarray:
+        """Content length of each chunk as an int array."""
+        return np.fromiter(
+            (len(chunk['content']) for chunk in chunks),
+            dtype=np.int64,
+            count=len(chunks)
+        )
+    
     def merge_small_chunks(self, chunks: List[Dict], min_size: int = 100) -> List[Dict]:
         """
         Merge chunks that are too small.
@@ -175,40 +369,26 @@ class ChunkingService:
         if not chunks:
             return []
         
+        small = self._chunk_sizes(chunks) < min_size
+        
+        # Boundaries of runs of consecutive small / non-small chunks
+        boundaries = np.flatnonzero(np.diff(small.astype(np.int8))) + 1
+        starts = [0, *boundaries.tolist()]
+        ends = [*boundaries.tolist(), len(chunks)]
+        
         merged = []
-        buffer = ""
-        buffer_metadata = None
         
-        for chunk in chunks:
-            content = chunk['content']
+        for start, end in zip(starts, ends):
+            if not small[start]:
+                merged.extend(chunks[start:end])
+                continue
             
-            if len(content) < min_size:
-                # Accumulate small chunks
-                if buffer:
-                    buffer += " " + content
-                else:
-                    buffer = content
-                    buffer_metadata = chunk['metadata'].copy()
-            else:
-                # Flush buffer if exists
-                if buffer:
-                    merged.append({
-                        'chunk_id': f"{buffer_metadata['doc_id']}_chunk_{len(merged)}",
-                        'content': buffer,
-                        'metadata': buffer_metadata
-                    })
-                    buffer = ""
-                    buffer_metadata = None
-                
-                # Add current chunk
-                merged.append(chunk)
-        
-        # Flush remaining buffer
-        if buffer and buffer_metadata:
+            # Merge each run of small chunks into one chunk
+            run_metadata = chunks[start]['metadata'].copy()
             merged.append({
-                'chunk_id': f"{buffer_metadata['doc_id']}_chunk_{len(merged)}",
-                'content': buffer,
-                'metadata': buffer_metadata
+                'chunk_id': f"{run_metadata['doc_id']}_chunk_{len(merged)}",
+                'content': " ".join(chunk['content'] for chunk in chunks[start:end]),
+                'metadata': run_metadata
             })
         
         # Update chunk indices and total
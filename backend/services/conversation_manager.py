@@ -1,20 +1,67 @@
 """Conversation manager for handling chat history."""
 
-from typing import List, Dict, Optional
-import json
+from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
+import orjson
+import sqlite3
 from pathlib import Path
 from datetime import datetime
 import uuid
 from backend.config import settings
 
+# Number of recently read conversations kept in memory
+CONVERSATION_CACHE_SIZE = 128
+
+INDEX_FILE = "index.db"
+
+# Index write-ahead log size (in pages) that triggers a checkpoint
+WAL_CHECKPOINT_PAGES = 1000
+
+_COLUMNS = ('conversation_id', 'title', 'created_at', 'updated_at', 'message_count')
+
 
 class ConversationManager:
-    """Manages conversation history and persistence."""
+    """
+    Manages conversation history and persistence.
+    
+    Conversation metadata (title, timestamps, message count) lives in a
+    SQLite index; messages are stored in an append-only ``{id}.jsonl`` file
+    per conversation, so adding a message writes only that message and a
+    single index row instead of rewriting the whole history.
+    """
     
     def __init__(self):
         """Initialize conversation manager."""
         self.conversations_dir = Path(settings.conversations_dir)
         self.conversations_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Autocommit; WAL lets listing proceed while a message is being added.
+        # Each commit is a single append to the write-ahead log; with
+        # synchronous=NORMAL the log is fsynced only when it is checkpointed
+        # (compacted) into the database, every WAL_CHECKPOINT_PAGES pages.
+        self._db = sqlite3.connect(
+            self.conversations_dir / INDEX_FILE,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(f"PRAGMA wal_autocheckpoint={WAL_CHECKPOINT_PAGES}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            "conversation_id TEXT PRIMARY KEY, title TEXT NOT NULL, "
+            "created_at TEXT NOT NULL, updated_at TEXT NOT NULL, "
+            "message_count INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conversations_updated_at "
+            "ON conversations (updated_at)"
+        )
+        
+        # (conversation_id, mtime_ns, size) -> messages
+        self._cache: "OrderedDict[Tuple[str, int, int], List[Dict]]" = OrderedDict()
+        
+        self._migrate_legacy_files()
     
     def create_conversation(self, title: Optional[str] = None) -> str:
         """
@@ -29,15 +76,13 @@ class ConversationManager:
         conversation_id = str(uuid.uuid4())
         timestamp = datetime.utcnow().isoformat()
         
-        conversation = {
-            'conversation_id': conversation_id,
-            'title': title or f"Conversation {conversation_id[:8]}",
-            'created_at': timestamp,
-            'updated_at': timestamp,
-            'messages': []
-        }
+        self._messages_path(conversation_id).touch()
+        self._db.execute(
+            "INSERT INTO conversations (conversation_id, title, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            (conversation_id, title or f"Conversation {conversation_id[:8]}", timestamp, timestamp)
+        )
         
-        self._save_conversation(conversation_id, conversation)
         return conversation_id
     
     def add_message(
@@ -56,11 +101,6 @@ class ConversationManager:
             content: Message content
             citations: Optional citations
         """
-        conversation = self.get_conversation(conversation_id)
-        
-        if not conversation:
-            raise ValueError(f"Conversation {conversation_id} not found")
-        
         message = {
             'role': role,
             'content': content,
@@ -68,10 +108,17 @@ class ConversationManager:
             'citations': citations or []
         }
         
-        conversation['messages'].append(message)
-        conversation['updated_at'] = datetime.utcnow().isoformat()
+        updated = self._db.execute(
+            "UPDATE conversations SET updated_at = ?, message_count = message_count + 1 "
+            "WHERE conversation_id = ?",
+            (message['timestamp'], conversation_id)
+        )
         
-        self._save_conversation(conversation_id, conversation)
+        if updated.rowcount == 0:
+            raise ValueError(f"Conversation {conversation_id} not found")
+        
+        with open(self._messages_path(conversation_id), 'ab') as f:
+            f.write(orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE))
     
     def get_conversation(self, conversation_id: str) -> Optional[Dict]:
         """
@@ -83,41 +130,47 @@ class ConversationManager:
         Returns:
             Conversation data or None
         """
-        file_path = self.conversations_dir / f"{conversation_id}.json"
+        row = self._db.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM conversations WHERE conversation_id = ?",
+            (conversation_id,)
+        ).fetchone()
         
-        if not file_path.exists():
+        if row is None:
             return None
         
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        messages_path = self._messages_path(conversation_id)
+        stat = messages_path.stat()
+        cache_key = (conversation_id, stat.st_mtime_ns, stat.st_size)
+        
+        messages = self._cache.get(cache_key)
+        if messages is None:
+            with open(messages_path, 'rb') as f:
+                messages = [orjson.loads(line) for line in f if line.strip()]
+            
+            self._cache[cache_key] = messages
+            if len(self._cache) > CONVERSATION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(cache_key)
+        
+        conversation = dict(zip(_COLUMNS, row))
+        del conversation['message_count']
+        
+        # Callers get their own message list; the cached one stays intact
+        conversation['messages'] = list(messages)
+        return conversation
     
     def list_conversations(self) -> List[Dict]:
         """
         List all conversations.
         
         Returns:
-            List of conversation summaries
+            List of conversation summaries (most recently updated first)
         """
-        conversations = []
-        
-        for file_path in self.conversations_dir.glob("*.json"):
-            try:
-                with open(file_path, 'r') as f:
-                    conv = json.load(f)
-                    conversations.append({
-                        'conversation_id': conv['conversation_id'],
-                        'title': conv['title'],
-                        'created_at': conv['created_at'],
-                        'updated_at': conv['updated_at'],
-                        'message_count': len(conv['messages'])
-                    })
-            except Exception as e:
-                print(f"Error loading conversation {file_path}: {e}")
-        
-        # Sort by updated_at (most recent first)
-        conversations.sort(key=lambda x: x['updated_at'], reverse=True)
-        
-        return conversations
+        rows = self._db.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM conversations ORDER BY updated_at DESC"
+        )
+        return [dict(zip(_COLUMNS, row)) for row in rows]
     
     def delete_conversation(self, conversation_id: str) -> bool:
         """
@@ -129,17 +182,44 @@ class ConversationManager:
         Returns:
             True if deleted, False if not found
         """
-        file_path = self.conversations_dir / f"{conversation_id}.json"
+        deleted = self._db.execute(
+            "DELETE FROM conversations WHERE conversation_id = ?",
+            (conversation_id,)
+        )
         
-        if not file_path.exists():
+        if deleted.rowcount == 0:
             return False
         
-        file_path.unlink()
+        self._messages_path(conversation_id).unlink(missing_ok=True)
         return True
     
-    def _save_conversation(self, conversation_id: str, conversation: Dict):
-        """Save conversation to file."""
-        file_path = self.conversations_dir / f"{conversation_id}.json"
-        
-        with open(file_path, 'w') as f:
-            json.dump(conversation, f, indent=2)
+    def _messages_path(self, conversation_id: str) -> Path:
+        """Path of a conversation's message log."""
+        return self.conversations_dir / f"{conversation_id}.jsonl"
+    
+    def _index_conversation(self, conv: Dict, message_count: int):
+        """Add a migrated conversation to the index."""
+        self._db.execute(
+            "INSERT OR REPLACE INTO conversations "
+            "(conversation_id, title, created_at, updated_at, message_count) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (conv['conversation_id'], conv['title'], conv['created_at'], conv['updated_at'], message_count)
+        )
+    
+    def _migrate_legacy_files(self):
+        """Convert legacy ``{id}.json`` conversation files to the index + JSONL layout."""
+        for file_path in self.conversations_dir.glob("*.json"):
+            try:
+                conv = orjson.loads(file_path.read_bytes())
+                messages = conv.get('messages', [])
+                
+                with open(self._messages_path(conv['conversation_id']), 'wb') as f:
+                    f.writelines(
+                        orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE)
+                        for message in messages
+                    )
+                
+                self._index_conversation(conv, len(messages))
+                file_path.unlink()
+            except Exception as e:
+                print(f"Error migrating conversation {file_path}: {e}")
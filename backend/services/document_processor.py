@@ -1,13 +1,183 @@
 """Document processing service for handling file uploads and text extraction."""
 
 import os
+import mmap
+import shutil
+import asyncio
+import logging
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+import numpy as np
 import PyPDF2
 import pdfplumber
+import pypdfium2 as pdfium
 from backend.config import settings
+from backend.services.chunking_service import ChunkBatch, ChunkingService
+from backend.services.process_pool import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+# Block size used when copying uploads to disk
+COPY_BLOCK_SIZE = 1024 * 1024
+
+# PDFs with at least this many pages are extracted across worker processes
+PDF_PARALLEL_MIN_PAGES = 8
+
+# Byte lookup table: True for ASCII whitespace (as treated by str.split)
+_WHITESPACE_BYTES = np.zeros(256, dtype=bool)
+_WHITESPACE_BYTES[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+
+
+def _count_words(data) -> int:
+    """
+    Count whitespace-separated words in UTF-8/ASCII-compatible bytes.
+    
+    Args:
+        data: Bytes-like object (bytes, mmap, ...)
+        
+    Returns:
+        Number of words
+    """
+    is_space = _WHITESPACE_BYTES[np.frombuffer(data, dtype=np.uint8)]
+    if not is_space.size:
+        return 0
+    # A word starts at each non-space byte preceded by a space (or the start)
+    starts = ~is_space
+    starts[1:] &= is_space[:-1]
+    return int(np.count_nonzero(starts))
+
+
+def _pdfium_page_text(pdf: "pdfium.PdfDocument", index: int) -> str:
+    """Extract one page's text with PDFium, releasing the page afterwards."""
+    page = pdf[index]
+    textpage = page.get_textpage()
+    try:
+        # PDFium separates lines with CRLF
+        return textpage.get_text_range().replace('\r\n', '\n')
+    finally:
+        textpage.close()
+        page.close()
+
+
+def _fallback_page_text(file_path: str, index: int) -> str:
+    """Extract one page with pdfplumber, or PyPDF2 if that fails too."""
+    try:
+        with pdfplumber.open(file_path, pages=[index + 1]) as plumber:
+            return plumber.pages[0].extract_text() or ""
+    except Exception as e:
+        logger.warning("pdfplumber failed on page %d, trying PyPDF2: %s", index + 1, e)
+        with open(file_path, 'rb') as f:
+            return PyPDF2.PdfReader(f).pages[index].extract_text() or ""
+
+
+def _page_text(pdf: "pdfium.PdfDocument", file_path: str, index: int) -> str:
+    """Extract one page with PDFium, falling back per page if PDFium fails on it."""
+    try:
+        return _pdfium_page_text(pdf, index)
+    except Exception as e:
+        logger.warning("pdfium failed on page %d, trying pdfplumber: %s", index + 1, e)
+        return _fallback_page_text(file_path, index)
+
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract a range of PDF pages with PDFium (runs in a worker process).
+    
+    Args:
+        file_path: Path to the PDF
+        start: Index of the first page (0-based)
+        stop: Index one past the last page
+        
+    Returns:
+        Page texts, each prefixed with its page marker
+    """
+    text_parts = []
+    
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        for page_num in range(start, stop):
+            text = _page_text(pdf, file_path, page_num)
+            # Add page marker for citation purposes; placeholder if no text
+            text_parts.append(f"[Page {page_num + 1}]\n{text or '[No text content]'}")
+    finally:
+        pdf.close()
+    
+    return text_parts
+
+
+def iter_pdf_pages(file_path: str) -> Iterator[Tuple[int, str]]:
+    """
+    Extract PDF text one page at a time.
+    
+    Each page is released after it is yielded, so memory stays bounded by
+    a single page rather than the whole document. Uses PDFium, falling back
+    to pdfplumber and then PyPDF2 for the whole file if it cannot be opened,
+    or for a single page if PDFium fails on that page.
+    
+    Args:
+        file_path: Path to the PDF
+        
+    Yields:
+        Tuples of (page number starting at 1, page text)
+    """
+    try:
+        pdf = pdfium.PdfDocument(file_path)
+    except Exception as e:
+        logger.warning("pdfium failed, trying pdfplumber: %s", e)
+    else:
+        try:
+            for index in range(len(pdf)):
+                yield index + 1, _page_text(pdf, file_path, index)
+        finally:
+            pdf.close()
+        return
+    
+    try:
+        plumber = pdfplumber.open(file_path)
+    except Exception as e:
+        logger.warning("pdfplumber failed, trying PyPDF2: %s", e)
+        with open(file_path, 'rb') as f:
+            for page_num, page in enumerate(PyPDF2.PdfReader(f).pages, 1):
+                yield page_num, page.extract_text() or ""
+        return
+    
+    with plumber:
+        for page_num, page in enumerate(plumber.pages, 1):
+            yield page_num, page.extract_text() or ""
+            page.close()
+
+
+def chunk_pdf_file(
+    chunker: ChunkingService,
+    file_path: str,
+    metadata: Dict
+) -> Tuple[Dict, ChunkBatch]:
+    """
+    Extract and chunk a stored PDF page by page (runs in a worker process).
+    
+    Character and word counts are accumulated as pages stream past, so they
+    are available without holding the whole text.
+    
+    Args:
+        chunker: Chunking service to split pages with
+        file_path: Path to the PDF
+        metadata: Document metadata (see ``DocumentProcessor.save_upload_stream``)
+        
+    Returns:
+        Tuple of (metadata with character and word counts, chunks)
+    """
+    counts = {'char_count': 0, 'word_count': 0}
+    
+    def counted_pages() -> Iterator[Tuple[int, str]]:
+        for page_num, text in iter_pdf_pages(file_path):
+            counts['char_count'] += len(text)
+            counts['word_count'] += _count_words(text.encode('utf-8', 'surrogatepass'))
+            yield page_num, text
+    
+    chunks = chunker.chunk_pages(counted_pages(), metadata)
+    return {**metadata, **counts}, chunks
 
 
 class DocumentProcessor:
@@ -33,38 +203,124 @@ class DocumentProcessor:
         Raises:
             ValueError: If file type is not supported
         """
-        # Validate file type
+        file_ext = self._validate_extension(filename)
+        file_path, doc_id, timestamp = self._new_upload_path(filename)
+        
+        with open(file_path, 'wb') as f:
+            f.write(file_content)
+        
+        return self._process_saved_file(file_path, filename, file_ext, doc_id, timestamp)
+    
+    async def process_upload_stream(self, source: BinaryIO, filename: str) -> Dict:
+        """
+        Process an uploaded file given as a binary file object.
+        
+        The file is copied to the upload directory in fixed-size blocks, so
+        large uploads are never held in memory as a single bytes object.
+        
+        Args:
+            source: Readable binary file object (e.g. ``UploadFile.file``)
+            filename: Original filename
+            
+        Returns:
+            Dictionary with metadata and extracted content
+            
+        Raises:
+            ValueError: If file type is not supported
+        """
+        stored = await self.save_upload_stream(source, filename)
+        
+        # Text extraction is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(
+            self._process_saved_file,
+            Path(stored['file_path']),
+            filename,
+            stored['file_type'],
+            stored['doc_id'],
+            stored['upload_timestamp']
+        )
+    
+    async def save_upload_stream(self, source: BinaryIO, filename: str) -> Dict:
+        """
+        Store an uploaded file without extracting its text.
+        
+        Used when the text is consumed incrementally afterwards (see
+        ``iter_pdf_pages``).
+        
+        Args:
+            source: Readable binary file object (e.g. ``UploadFile.file``)
+            filename: Original filename
+            
+        Returns:
+            Document metadata (without character and word counts)
+            
+        Raises:
+            ValueError: If file type is not supported
+        """
+        file_ext = self._validate_extension(filename)
+        file_path, doc_id, timestamp = self._new_upload_path(filename)
+        
+        def copy_to_disk():
+            with open(file_path, 'wb') as f:
+                shutil.copyfileobj(source, f, COPY_BLOCK_SIZE)
+        
+        await asyncio.to_thread(copy_to_disk)
+        
+        return {
+            'doc_id': doc_id,
+            'filename': filename,
+            'file_path': str(file_path),
+            'file_type': file_ext,
+            'upload_timestamp': timestamp,
+            'file_size': file_path.stat().st_size
+        }
+    
+    def _validate_extension(self, filename: str) -> str:
+        """Return the lowercased file extension, or raise if unsupported."""
         file_ext = Path(filename).suffix.lower()
         if file_ext not in self.SUPPORTED_EXTENSIONS:
             raise ValueError(
                 f"Unsupported file type: {file_ext}. "
                 f"Supported types: {', '.join(self.SUPPORTED_EXTENSIONS)}"
             )
-        
-        # Generate unique document ID
+        return file_ext
+    
+    def _new_upload_path(self, filename: str):
+        """Allocate a document ID, timestamp and storage path for an upload."""
         doc_id = str(uuid.uuid4())
         timestamp = datetime.utcnow().isoformat()
         
-        # Save file
         safe_filename = self._sanitize_filename(filename)
         file_path = self.upload_dir / f"{doc_id}_{safe_filename}"
         
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
-        
-        # Extract text
+        return file_path, doc_id, timestamp
+    
+    def _process_saved_file(
+        self,
+        file_path: Path,
+        filename: str,
+        file_ext: str,
+        doc_id: str,
+        timestamp: str
+    ) -> Dict:
+        """Extract text from a stored upload and build its metadata."""
         text_content = self._extract_text(file_path, file_ext)
         
-        # Create metadata
+        if file_ext == '.pdf':
+            word_count = _count_words(text_content.encode('utf-8', 'surrogatepass'))
+        else:
+            # Plain text: scan the file's bytes directly
+            word_count = self._count_file_words(file_path)
+        
         metadata = {
             'doc_id': doc_id,
             'filename': filename,
             'file_path': str(file_path),
             'file_type': file_ext,
             'upload_timestamp': timestamp,
-            'file_size': len(file_content),
+            'file_size': file_path.stat().st_size,
             'char_count': len(text_content),
-            'word_count': len(text_content.split())
+            'word_count': word_count
         }
         
         return {
@@ -99,18 +355,58 @@ class DocumentProcessor:
             raise ValueError(f"Unsupported extension: {file_ext}")
     
     def _extract_text_file(self, file_path: Path) -> str:
-        """Extract text from .txt or .md files."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except UnicodeDecodeError:
-            # Try with different encoding if UTF-8 fails
-            with open(file_path, 'r', encoding='latin-1') as f:
-                return f.read()
+        """
+        Extract text from .txt or .md files.
+        
+        The file is memory-mapped and decoded straight from the mapping,
+        without first reading it into an intermediate bytes object.
+        """
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                try:
+                    return str(mapped, 'utf-8')
+                except UnicodeDecodeError:
+                    # Try with different encoding if UTF-8 fails
+                    return str(mapped, 'latin-1')
+    
+    @staticmethod
+    def _count_file_words(file_path: Path) -> int:
+        """Count words in a text file by scanning its memory-mapped bytes."""
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return _count_words(mapped)
     
     def _extract_pdf(self, file_path: Path) -> str:
         """
-        Extract text from PDF using pdfplumber.
+        Extract text from PDF using PDFium (pypdfium2).
+        
+        PDFium is a native extractor and much faster than the pure-Python
+        pdfplumber/PyPDF2, which remain as fallbacks.
+        """
+        try:
+            pdf = pdfium.PdfDocument(file_path)
+            page_count = len(pdf)
+            pdf.close()
+            
+            if page_count < PDF_PARALLEL_MIN_PAGES:
+                text_parts = _extract_pdf_pages(str(file_path), 0, page_count)
+            else:
+                text_parts = self._extract_pdf_parallel(str(file_path), page_count)
+        except Exception as e:
+            logger.warning("pdfium failed, trying pdfplumber: %s", e)
+            return self._extract_pdf_pdfplumber(file_path)
+        
+        return "\n\n".join(text_parts)
+    
+    def _extract_pdf_pdfplumber(self, file_path: Path) -> str:
+        """
+        Fallback PDF extraction using pdfplumber.
         
         pdfplumber is more reliable than PyPDF2 for text extraction
         and handles complex layouts better.
@@ -121,19 +417,29 @@ class DocumentProcessor:
             with pdfplumber.open(file_path) as pdf:
                 for page_num, page in enumerate(pdf.pages, 1):
                     text = page.extract_text()
-                    if text:
-                        # Add page marker for citation purposes
-                        text_parts.append(f"[Page {page_num}]\n{text}")
-                    else:
-                        # If no text found, add placeholder
-                        text_parts.append(f"[Page {page_num}]\n[No text content]")
+                    text_parts.append(f"[Page {page_num}]\n{text or '[No text content]'}")
+                    page.close()
         except Exception as e:
             # Fallback to PyPDF2 if pdfplumber fails
-            print(f"pdfplumber failed, trying PyPDF2: {e}")
+            logger.warning("pdfplumber failed, trying PyPDF2: %s", e)
             return self._extract_pdf_pypdf2(file_path)
         
         return "\n\n".join(text_parts)
     
+    @staticmethod
+    def _extract_pdf_parallel(file_path: str, page_count: int) -> List[str]:
+        """Extract PDF pages in contiguous ranges across the shared process pool."""
+        workers = os.cpu_count() or 1
+        step = -(-page_count // workers)
+        starts = range(0, page_count, step)
+        stops = [min(start + step, page_count) for start in starts]
+        
+        # map() yields results in submission order, so page order is preserved
+        ranges = get_process_pool().map(
+            _extract_pdf_pages, [file_path] * len(starts), starts, stops
+        )
+        return [text for page_texts in ranges for text in page_texts]
+    
     def _extract_pdf_pypdf2(self, file_path: Path) -> str:
         """Fallback PDF extraction using PyPDF2."""
         text_parts = []
@@ -0,0 +1,167 @@
+"""Persistent content-addressed cache of document chunk embeddings."""
+
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from backend.config import settings
+from backend.services.embedding_service import EmbeddingService
+
+# Entries kept in the in-memory LRU in front of SQLite
+MEMORY_CACHE_SIZE = 10_000
+
+# Stay below SQLite's bound-parameter limit in bulk lookups
+_SELECT_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    Embedding cache keyed by SHA-256 of the text.
+    
+    Lookups go to an in-memory LRU first and then to a SQLite table, so
+    repeated chunks (boilerplate headers, disclaimers, re-uploads) are
+    embedded only once. Entries are scoped to the model variant (name,
+    backend and precision) and dimension, so switching models or inference
+    settings never returns stale vectors.
+    
+    Vectors are stored on disk as int8 with a per-vector scale (a quarter
+    of the float32 size) unless quantization is disabled; each row records
+    its dtype, so float32 rows written earlier still load. The in-memory
+    LRU holds the same (dequantized) values as disk.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        model: str = settings.embedding_model,
+        dim: int = settings.embedding_dimension,
+        quantize: bool = settings.embedding_cache_quantize
+    ):
+        """
+        Open (or create) the cache database.
+        
+        Args:
+            path: SQLite database file
+            model: Model variant the cached vectors belong to (see
+                ``EmbeddingService.variant``)
+            dim: Embedding dimension
+            quantize: Store vectors as int8 with a per-vector scale
+        """
+        self.model = model
+        self.dim = dim
+        self.quantize = quantize
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "hash TEXT NOT NULL, model TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL, "
+            "PRIMARY KEY (hash, model, dim))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+        if 'dtype' not in columns:
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'float32'")
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN scale REAL")
+        self._conn.commit()
+    
+    @staticmethod
+    def key(text: str) -> str:
+        """Cache key for a text."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings.
+        
+        Args:
+            keys: Cache keys (see ``key``)
+            
+        Returns:
+            Mapping of found keys to float32 vectors
+        """
+        found = {}
+        missing = []
+        
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            
+            for i in range(0, len(missing), _SELECT_BATCH):
+                batch = missing[i:i + _SELECT_BATCH]
+                rows = self._conn.execute(
+                    "SELECT hash, vec, dtype, scale FROM embeddings WHERE model = ? AND dim = ? "
+                    f"AND hash IN ({', '.join('?' * len(batch))})",
+                    (self.model, self.dim, *batch)
+                )
+                for key, blob, dtype, scale in rows:
+                    found[key] = self._decode(blob, dtype, scale)
+                    self._remember(key, found[key])
+        
+        return found
+    
+    def put_many(self, items: Dict[str, np.ndarray]):
+        """
+        Store embeddings.
+        
+        Args:
+            items: Mapping of cache keys to vectors
+        """
+        if not items:
+            return
+        
+        rows: List[tuple] = []
+        
+        with self._lock:
+            for key, vector in items.items():
+                encoded = self._encode(np.asarray(vector, dtype=np.float32))
+                # Keep what a later read from disk would return, so warm and
+                # cold lookups give identical vectors
+                self._remember(key, self._decode(*encoded))
+                rows.append((key, self.model, self.dim, *encoded))
+            
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (hash, model, dim, vec, dtype, scale) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+    
+    def _encode(self, vector: np.ndarray) -> Tuple[bytes, str, Optional[float]]:
+        """Serialize a float32 vector as (blob, dtype, scale)."""
+        if not self.quantize:
+            return vector.tobytes(), 'float32', None
+        
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        quantized = np.round(vector / scale).astype(np.int8)
+        return quantized.tobytes(), 'int8', scale
+    
+    @staticmethod
+    def _decode(blob: bytes, dtype: str, scale: Optional[float]) -> np.ndarray:
+        """Deserialize a stored vector to float32."""
+        if dtype == 'int8':
+            return np.frombuffer(blob, dtype=np.int8).astype(np.float32) * np.float32(scale)
+        return np.frombuffer(blob, dtype=np.float32)
+    
+    def _remember(self, key: str, vector: np.ndarray):
+        """Add to the in-memory LRU (caller holds the lock)."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > MEMORY_CACHE_SIZE:
+            self._memory.popitem(last=False)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache."""
+    return EmbeddingCache(settings.embedding_cache_path, model=EmbeddingService().variant)
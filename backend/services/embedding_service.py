@@ -1,16 +1,48 @@
 """Embedding service using HuggingFace sentence-transformers."""
 
 from sentence_transformers import SentenceTransformer
-from typing import List, Union
+from cachetools import LRUCache
+from functools import lru_cache
+from typing import List, Optional, Union
+import asyncio
+import hashlib
+import math
+import threading
 import numpy as np
+import torch
 from backend.config import settings
+from backend.services.micro_batcher import MicroBatcher
+
+# Concurrent embedding requests are coalesced for this long, up to this many texts
+EMBED_BATCH_WINDOW_SECONDS = 0.02
+EMBED_MAX_BATCH = 96
+
+# Batches at least this large are split across worker processes, one per GPU
+# when several are available
+MULTI_PROCESS_MIN_TEXTS = 1000
+
+# Single-text (query) embeddings kept in memory
+QUERY_EMBEDDING_CACHE_SIZE = 2048
+
+# FP16 Tensor Core kernels need sequence lengths padded to a multiple of this
+TENSOR_CORE_PAD_MULTIPLE = 8
 
 
 class EmbeddingService:
-    """Generate embeddings using HuggingFace sentence-transformers."""
+    """
+    Generate embeddings using HuggingFace sentence-transformers.
+    
+    All embeddings are L2-normalized at encode time, so cosine similarity
+    between them is a dot product.
+    """
     
     _instance = None
     _model = None
+    _pool = None
+    
+    # Embeddings of recently embedded single texts (mostly queries)
+    _text_cache: LRUCache = LRUCache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+    _text_cache_lock = threading.Lock()
     
     def __new__(cls):
         """Singleton pattern to avoid loading model multiple times."""
@@ -21,10 +53,89 @@ class EmbeddingService:
     def __init__(self):
         """Initialize embedding service with configured model."""
         if self._model is None:
-            print(f"🔄 Loading embedding model: {settings.embedding_model}")
-            self._model = SentenceTransformer(settings.embedding_model)
+            device = settings.embedding_device or ("cuda" if torch.cuda.is_available() else "cpu")
+            backend = settings.embedding_backend
+            print(f"🔄 Loading embedding model: {settings.embedding_model} ({device}, {backend})")
+            self._model = self._load_model(backend, device)
             print(f"✅ Embedding model loaded (dimension: {settings.embedding_dimension})")
     
+    def _load_model(self, backend: str, device: str) -> SentenceTransformer:
+        """
+        Load the embedding model with the configured inference backend.
+        
+        "sbert" runs PyTorch (with reduced precision, see
+        ``_reduce_precision``); "onnx" runs the exported ONNX graph on ONNX
+        Runtime and "onnx-int8" its dynamically int8-quantized variant.
+        Pooling and normalization are identical in every backend.
+        """
+        if backend == "sbert":
+            return self._reduce_precision(SentenceTransformer(settings.embedding_model, device=device))
+        
+        if backend == "onnx":
+            return SentenceTransformer(settings.embedding_model, device=device, backend="onnx")
+        
+        if backend == "onnx-int8":
+            return SentenceTransformer(
+                settings.embedding_model,
+                device=device,
+                backend="onnx",
+                model_kwargs={"file_name": settings.embedding_onnx_int8_file}
+            )
+        
+        raise ValueError(f"Unsupported embedding backend: {backend}")
+    
+    @staticmethod
+    def _reduce_precision(model: SentenceTransformer) -> SentenceTransformer:
+        """
+        Reduce model precision for faster inference.
+        
+        Uses FP16 weights on GPU (``embedding_fp16``) and dynamic int8
+        quantization of the linear layers on CPU (``embedding_quantize``).
+        Embeddings are always returned as float32.
+        """
+        if model.device.type == "cuda":
+            if not settings.embedding_fp16:
+                return model
+            EmbeddingService._pad_for_tensor_cores(model)
+            return model.half()
+        
+        if not settings.embedding_quantize:
+            return model
+        
+        return torch.quantization.quantize_dynamic(
+            model,
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+    
+    @staticmethod
+    def _pad_for_tensor_cores(model: SentenceTransformer):
+        """
+        Round tokenized batch lengths up to TENSOR_CORE_PAD_MULTIPLE.
+        
+        Wraps the transformer module's ``tokenize`` so every batch is padded
+        to a multiple of 8 tokens; odd lengths would otherwise fall back from
+        Tensor Cores to regular CUDA cores.
+        """
+        transformer = model._first_module()
+        tokenize = transformer.tokenize
+        pad_token_id = transformer.tokenizer.pad_token_id or 0
+        pad_left = transformer.tokenizer.padding_side == "left"
+        
+        def padded_tokenize(texts, *args, **kwargs):
+            features = tokenize(texts, *args, **kwargs)
+            extra = -features['input_ids'].shape[1] % TENSOR_CORE_PAD_MULTIPLE
+            if extra:
+                for key, value in features.items():
+                    if isinstance(value, torch.Tensor) and value.dim() == 2:
+                        fill = pad_token_id if key == 'input_ids' else 0
+                        features[key] = torch.nn.functional.pad(
+                            value, (extra, 0) if pad_left else (0, extra), value=fill
+                        )
+            return features
+        
+        transformer.tokenize = padded_tokenize
+    
     @property
     def model(self) -> SentenceTransformer:
         """Get the embedding model."""
@@ -35,10 +146,32 @@ class EmbeddingService:
         """Get embedding dimension."""
         return settings.embedding_dimension
     
+    @property
+    def variant(self) -> str:
+        """
+        Identify the model, inference backend and precision in use.
+        
+        FP16, int8 and ONNX runs of the same model give slightly different
+        vectors, so stored embeddings are keyed by this, not the model name.
+        """
+        backend = settings.embedding_backend
+        if backend == "onnx-int8":
+            precision = settings.embedding_onnx_int8_file
+        elif backend == "onnx":
+            precision = "fp32"
+        elif self.model.device.type == "cuda":
+            precision = "fp16" if settings.embedding_fp16 else "fp32"
+        else:
+            precision = "int8" if settings.embedding_quantize else "fp32"
+        return f"{settings.embedding_model}|{backend}|{precision}"
+    
     def embed_text(self, text: str) -> List[float]:
         """
         Generate embedding for single text.
         
+        Results are kept in an LRU cache keyed by the SHA-256 digest of the
+        text, so repeated queries skip the model.
+        
         Args:
             text: Input text to embed
             
@@ -49,15 +182,25 @@ class EmbeddingService:
             # Return zero vector for empty text
             return [0.0] * self.dimension
         
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        key = hashlib.sha256(text.encode('utf-8')).digest()
+        with self._text_cache_lock:
+            cached = self._text_cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
+        embedding = self.model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
+        embedding = embedding.astype(np.float32, copy=False).tolist()
+        
+        with self._text_cache_lock:
+            self._text_cache[key] = embedding
+        return list(embedding)
     
     def embed_batch(
         self, 
         texts: List[str], 
         batch_size: int = 32,
         show_progress: bool = False
-    ) -> List[List[float]]:
+    ) -> np.ndarray:
         """
         Generate embeddings for batch of texts.
         
@@ -67,10 +210,12 @@ class EmbeddingService:
             show_progress: Whether to show progress bar
             
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dimension); rows of empty
+            texts are zero vectors
         """
+        result = np.zeros((len(texts), self.dimension), dtype=np.float32)
         if not texts:
-            return []
+            return result
         
         # Filter out empty texts and keep track of indices
         valid_texts = []
@@ -83,48 +228,106 @@ class EmbeddingService:
         
         if not valid_texts:
             # All texts are empty, return zero vectors
-            return [[0.0] * self.dimension] * len(texts)
+            return result
         
-        # Generate embeddings for valid texts
+        # Generate embeddings for valid texts in a single encode() call:
+        # it sorts texts by length before batching (and restores the input
+        # order), so each batch pads only to similar-length neighbours
         embeddings = self.model.encode(
             valid_texts,
             batch_size=batch_size,
             convert_to_numpy=True,
+            normalize_embeddings=True,
             show_progress_bar=show_progress
         )
         
-        # Create result list with zero vectors for empty texts
-        result = [[0.0] * self.dimension] * len(texts)
+        # Fill in embeddings for valid texts; empty texts keep zero vectors
+        result[valid_indices] = embeddings
+        return result
+    
+    def embed_batch_multiprocess(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Generate embeddings for a large batch across several processes.
         
-        # Fill in embeddings for valid texts
-        for idx, embedding in zip(valid_indices, embeddings):
-            result[idx] = embedding.tolist()
+        The worker pool is started on first use with one worker per GPU.
+        On CPU or a single GPU a pool adds nothing (on CPU, torch already
+        uses every core in one process, so workers would only compete for
+        them) and ``embed_batch`` is used instead.
         
-        return result
+        Args:
+            texts: List of non-empty input texts
+            batch_size: Batch size per worker
+            
+        Returns:
+            Array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        
+        if self.model.device.type != "cuda" or torch.cuda.device_count() < 2:
+            return self.embed_batch(texts, batch_size)
+        
+        if self._pool is None:
+            devices = [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+            print(f"🔄 Starting embedding worker pool on {devices}")
+            EmbeddingService._pool = self.model.start_multi_process_pool(target_devices=devices)
+        
+        return self.model.encode_multi_process(
+            texts, self._pool, batch_size=batch_size, normalize_embeddings=True
+        ).astype(np.float32, copy=False)
+    
+    def close(self):
+        """Stop the multi-process worker pool if it was started."""
+        if self._pool is not None:
+            SentenceTransformer.stop_multi_process_pool(self._pool)
+            EmbeddingService._pool = None
+    
+    def embed_texts(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Generate L2-normalized embeddings for texts in one batched call.
+        
+        Args:
+            texts: List of input texts
+            batch_size: Batch size for processing
+            
+        Returns:
+            Array of shape (len(texts), dimension); dot products are cosine similarities
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).astype(np.float32, copy=False)
     
     def similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
         Calculate cosine similarity between two embeddings.
         
+        Accepts any vectors, not only this service's unit-norm output; zero
+        vectors (e.g. from empty text) have similarity 0.
+        
         Args:
             embedding1: First embedding vector
             embedding2: Second embedding vector
             
         Returns:
-            Cosine similarity score (0 to 1)
+            Cosine similarity score (-1 to 1)
         """
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
+        vec1 = np.asarray(embedding1, dtype=np.float32)
+        vec2 = np.asarray(embedding2, dtype=np.float32)
         
-        # Cosine similarity
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
+        # Cosine similarity with a single square root for both norms
+        dot_product = float(np.dot(vec1, vec2))
+        norms_squared = float(np.vdot(vec1, vec1) * np.vdot(vec2, vec2))
         
-        if norm1 == 0 or norm2 == 0:
+        if norms_squared <= 0:
             return 0.0
         
-        return float(dot_product / (norm1 * norm2))
+        return dot_product / math.sqrt(norms_squared)
     
     def get_model_info(self) -> dict:
         """
@@ -141,6 +344,54 @@ class EmbeddingService:
         }
 
 
+class EmbeddingBatcher(MicroBatcher):
+    """
+    Coalesce concurrent embedding requests into batched model calls.
+    
+    Requests arriving within EMBED_BATCH_WINDOW_SECONDS of each other (for
+    example chunks from several documents uploaded at once) are embedded in
+    a single ``embed_batch`` call of up to EMBED_MAX_BATCH texts, run in a
+    worker thread so the event loop stays free.
+    """
+    
+    def __init__(self, embedding_service: EmbeddingService):
+        """
+        Initialize batcher.
+        
+        Args:
+            embedding_service: Service used to compute embeddings
+        """
+        super().__init__(self._embed_batch, EMBED_BATCH_WINDOW_SECONDS, EMBED_MAX_BATCH)
+        self.embedding_service = embedding_service
+    
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, sharing a model call with concurrent requests.
+        
+        Args:
+            texts: List of input texts
+            
+        Returns:
+            Array of embedding vectors, in input order
+        """
+        if not texts:
+            return np.empty((0, self.embedding_service.dimension), dtype=np.float32)
+        
+        return await self.submit(texts)
+    
+    async def _embed_batch(self, batch: List[str]) -> np.ndarray:
+        """Embed one coalesced batch in a worker thread."""
+        return await asyncio.to_thread(
+            self.embedding_service.embed_batch, batch, EMBED_MAX_BATCH
+        )
+
+
+@lru_cache(maxsize=1)
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Get the process-wide embedding batcher."""
+    return EmbeddingBatcher(EmbeddingService())
+
+
 # Example usage
 if __name__ == "__main__":
     # Initialize service
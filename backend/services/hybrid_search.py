@@ -1,9 +1,45 @@
 """Hybrid search combining dense and sparse retrieval."""
 
-from typing import List, Dict, Optional
-from rank_bm25 import BM25Okapi
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+from backend.config import settings
+from backend.services.bm25s_index import BM25SIndex
 from backend.services.vector_store import VectorStore
 import numpy as np
+import orjson
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+# File under bm25_cache_path naming the version directory holding the index
+BM25_CURRENT_FILE = "CURRENT"
+
+# Number of distinct queries whose tokens are memoized
+QUERY_TOKEN_CACHE_SIZE = 1024
+
+# Word characters (Unicode-aware); punctuation is dropped
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    """
+    Tokenize text for BM25.
+    
+    ``settings.bm25_tokenizer`` selects "regex" (runs of word characters,
+    so "RAG," and "rag" match) or "simple" (whitespace split).
+    """
+    if settings.bm25_tokenizer == "simple":
+        return text.lower().split()
+    return _TOKEN_RE.findall(text.lower())
+
+
+@lru_cache(maxsize=QUERY_TOKEN_CACHE_SIZE)
+def _tokenize_query(query: str) -> Tuple[str, ...]:
+    """Tokenize a query for BM25, memoized for repeated queries."""
+    return tuple(_tokenize(query))
 
 
 class HybridSearch:
@@ -20,6 +56,14 @@ class HybridSearch:
         self.bm25_index = None
         self.bm25_corpus = []
         self.bm25_metadata = []
+        
+        # Chunk text -> tokens, so rebuilding the index only tokenizes new chunks
+        self._corpus_tokens: Dict[str, List[str]] = {}
+        
+        # Serializes incremental updates (uploads and deletions run concurrently)
+        self._bm25_lock = threading.Lock()
+        
+        self._load_bm25_cache()
     
     def index_for_bm25(self, chunks: List[Dict]):
         """
@@ -32,18 +76,132 @@ class HybridSearch:
             self.bm25_index = None
             self.bm25_corpus = []
             self.bm25_metadata = []
+            self._corpus_tokens = {}
+            if settings.bm25_cache_path:
+                (Path(settings.bm25_cache_path) / BM25_CURRENT_FILE).unlink(missing_ok=True)
             return
         
         print(f"🔄 Building BM25 index for {len(chunks)} chunks...")
         
-        self.bm25_corpus = [chunk['content'] for chunk in chunks]
-        self.bm25_metadata = chunks
+        corpus = [chunk['content'] for chunk in chunks]
         
-        # Tokenize corpus (simple whitespace tokenization)
-        tokenized_corpus = [doc.lower().split() for doc in self.bm25_corpus]
-        self.bm25_index = BM25Okapi(tokenized_corpus)
+        # Tokenize corpus, reusing tokens of chunks indexed before
+        previous = self._corpus_tokens
+        self._corpus_tokens = {
+            doc: previous.get(doc) or _tokenize(doc)
+            for doc in corpus
+        }
+        index = BM25SIndex([self._corpus_tokens[doc] for doc in corpus])
+        
+        # Swap in the new corpus only once the index over it is ready
+        self.bm25_corpus = corpus
+        self.bm25_metadata = chunks
+        self.bm25_index = index
         
         print(f"✅ BM25 index built")
+        
+        self._save_bm25_cache()
+    
+    def add_to_bm25(self, chunks: List[Dict]):
+        """
+        Add newly uploaded chunks to the BM25 index.
+        
+        The index is rebuilt over the current corpus plus the new chunks
+        (tokens of chunks indexed before are reused) and saved.
+        
+        Args:
+            chunks: Chunks to add, with 'chunk_id', 'content' and 'metadata'
+        """
+        with self._bm25_lock:
+            self.index_for_bm25(self.bm25_metadata + list(chunks))
+    
+    def remove_from_bm25(self, doc_id: str):
+        """
+        Remove a document's chunks from the BM25 index.
+        
+        Args:
+            doc_id: Document ID
+        """
+        with self._bm25_lock:
+            remaining = [
+                chunk for chunk in self.bm25_metadata
+                if chunk.get('metadata', {}).get('doc_id') != doc_id
+            ]
+            if len(remaining) != len(self.bm25_metadata):
+                self.index_for_bm25(remaining)
+    
+    def _save_bm25_cache(self):
+        """
+        Persist the BM25 index and its chunks to ``settings.bm25_cache_path``.
+        
+        Each save goes to a fresh version directory, which is then published
+        by atomically replacing the ``CURRENT`` pointer file. Readers never see
+        a half-written index, concurrent savers each publish a complete one,
+        and files memory-mapped by a live index are never overwritten.
+        """
+        if not settings.bm25_cache_path:
+            return
+        
+        root = Path(settings.bm25_cache_path)
+        try:
+            root.mkdir(parents=True, exist_ok=True)
+            previous = self._current_bm25_version(root)
+            
+            version = Path(tempfile.mkdtemp(prefix="v", dir=root))
+            self.bm25_index.save(str(version))
+            (version / "chunks.json").write_bytes(orjson.dumps(
+                {'tokenizer': settings.bm25_tokenizer, 'chunks': self.bm25_metadata},
+                option=orjson.OPT_SERIALIZE_NUMPY
+            ))
+            
+            pointer = root / f"{BM25_CURRENT_FILE}.{version.name}"
+            pointer.write_text(version.name)
+            os.replace(pointer, root / BM25_CURRENT_FILE)
+        except Exception as e:
+            print(f"⚠️  Failed to save BM25 index: {e}")
+            return
+        
+        # Open memory maps keep their files alive after removal
+        if previous is not None and previous != version.name:
+            shutil.rmtree(root / previous, ignore_errors=True)
+    
+    def _load_bm25_cache(self):
+        """Restore the last built BM25 index, if one was saved."""
+        if not settings.bm25_cache_path:
+            return
+        
+        root = Path(settings.bm25_cache_path)
+        version = self._current_bm25_version(root)
+        if version is None:
+            return
+        
+        try:
+            saved = orjson.loads((root / version / "chunks.json").read_bytes())
+            # An index built with another tokenizer would not match query tokens
+            if saved.get('tokenizer') != settings.bm25_tokenizer:
+                return
+            chunks = saved['chunks']
+            index = BM25SIndex.load(str(root / version))
+            if index.matrix.shape[0] != len(chunks):
+                raise ValueError(
+                    f"index has {index.matrix.shape[0]} documents but {len(chunks)} chunks"
+                )
+        except Exception as e:
+            print(f"⚠️  Failed to load BM25 index, it will be rebuilt: {e}")
+            return
+        
+        self.bm25_index = index
+        self.bm25_metadata = chunks
+        self.bm25_corpus = [chunk['content'] for chunk in chunks]
+        print(f"✅ BM25 index loaded ({len(chunks)} chunks)")
+    
+    @staticmethod
+    def _current_bm25_version(root: Path) -> Optional[str]:
+        """Name of the published BM25 index version directory, if any."""
+        try:
+            return (root / BM25_CURRENT_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
     
     async def hybrid_search(
         self,
@@ -106,24 +264,30 @@ class HybridSearch:
             return []
         
         # Tokenize query
-        tokenized_query = query.lower().split()
+        tokenized_query = _tokenize_query(query)
         
         # Get BM25 scores
         scores = self.bm25_index.get_scores(tokenized_query)
         
-        # Get top-k indices
-        top_indices = np.argsort(scores)[::-1][:top_k]
+        # Only documents with positive scores are candidates
+        candidates = np.flatnonzero(scores > 0)
+        k = min(top_k, len(candidates))
+        if k == 0:
+            return []
+        
+        # Partial selection of the top k, then sort just those
+        part = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top_indices = part[np.argsort(-scores[part])]
         
         results = []
-        for idx in top_indices:
-            if scores[idx] > 0:  # Only include results with positive scores
-                chunk = self.bm25_metadata[idx]
-                results.append({
-                    'chunk_id': chunk.get('chunk_id', f'bm25_{idx}'),
-                    'score': float(scores[idx]),
-                    'content': self.bm25_corpus[idx],
-                    'metadata': chunk.get('metadata', {})
-                })
+        for idx in top_indices.tolist():
+            chunk = self.bm25_metadata[idx]
+            results.append({
+                'chunk_id': chunk.get('chunk_id', f'bm25_{idx}'),
+                'score': float(scores[idx]),
+                'content': self.bm25_corpus[idx],
+                'metadata': chunk.get('metadata', {})
+            })
         
         return results
     
@@ -160,6 +324,7 @@ class HybridSearch:
                 'score': dense_weight / (k + rank),
                 'content': result['content'],
                 'metadata': result['metadata'],
+                'embedding': result.get('embedding'),
                 'dense_rank': rank,
                 'sparse_rank': None,
                 'dense_score': result.get('score', 0)
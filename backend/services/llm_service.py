@@ -0,0 +1,28 @@
+"""Shared HuggingFace LLM client used by the agents."""
+
+from functools import lru_cache
+from typing import Optional
+from langchain_huggingface import HuggingFaceEndpoint
+from backend.config import settings
+
+
+@lru_cache(maxsize=1)
+def get_llm() -> Optional[HuggingFaceEndpoint]:
+    """
+    Get the process-wide HuggingFace endpoint client.
+
+    The endpoint (and its underlying HTTP session) is created once and
+    shared by all agents; sampling parameters such as temperature and
+    max_new_tokens are passed per call to ``ainvoke``.
+
+    Returns:
+        HuggingFaceEndpoint instance, or None if no API key is configured
+    """
+    if not settings.huggingface_api_key:
+        return None
+
+    return HuggingFaceEndpoint(
+        repo_id=settings.hf_model_name,
+        huggingfacehub_api_token=settings.huggingface_api_key,
+        task="text-generation"
+    )
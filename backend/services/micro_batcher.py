@@ -0,0 +1,102 @@
+"""Coalesce concurrent async requests into batched calls."""
+
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+import asyncio
+
+
+class MicroBatcher:
+    """
+    Collect requests arriving within a short window into one batched call.
+    
+    Each caller submits a list of items and receives the slice of the batch
+    results belonging to its items, in order. The worker task is started on
+    first use; ``close`` stops it and cancels every request still waiting.
+    """
+    
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Awaitable[Sequence]],
+        window_seconds: float,
+        max_batch: int
+    ):
+        """
+        Initialize batcher.
+        
+        Args:
+            batch_fn: Coroutine function computing results for a list of
+                items (one result per item, in order)
+            window_seconds: How long to wait for more requests to join a batch
+            max_batch: Stop adding requests once a batch has this many items
+        """
+        self.batch_fn = batch_fn
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def submit(self, items: List[Any]) -> Sequence:
+        """
+        Process items, sharing a batched call with concurrent requests.
+        
+        Args:
+            items: Items to process
+            
+        Returns:
+            Results for ``items``, in input order
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._batch_loop())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((items, future))
+        return await future
+    
+    async def close(self):
+        """Stop the worker; requests still waiting are cancelled."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+    
+    async def _batch_loop(self):
+        """Drain queued requests and process them in batches."""
+        pending: List[Tuple[List[Any], asyncio.Future]] = []
+        try:
+            while True:
+                pending = [await self._queue.get()]
+                total = len(pending[0][0])
+                
+                # Give concurrent callers a moment to join this batch
+                await asyncio.sleep(self.window_seconds)
+                while total < self.max_batch and not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    pending.append(item)
+                    total += len(item[0])
+                
+                batch = [x for items, _ in pending for x in items]
+                try:
+                    results = await self.batch_fn(batch)
+                except Exception as e:
+                    # Don't leave callers waiting on a batch that can't complete
+                    for _, future in pending:
+                        if not future.done():
+                            future.set_exception(e)
+                    pending = []
+                    continue
+                
+                offset = 0
+                for items, future in pending:
+                    if not future.done():
+                        future.set_result(results[offset:offset + len(items)])
+                    offset += len(items)
+                pending = []
+        finally:
+            # Reached only when the worker is cancelled (close or shutdown)
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            for _, future in pending:
+                future.cancel()
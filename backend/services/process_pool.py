@@ -0,0 +1,41 @@
+"""Shared worker process pool for CPU-bound document work."""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import multiprocessing
+import os
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def start_process_pool() -> ProcessPoolExecutor:
+    """
+    Start the process-wide worker pool (call once at application startup).
+    
+    Workers are spawned rather than forked, so they start from a clean
+    interpreter instead of inheriting the parent's torch threads or CUDA
+    context. PDF extraction and chunking both run on this pool.
+    
+    Returns:
+        The shared pool
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the shared worker pool, starting it if startup did not."""
+    return _pool or start_process_pool()
+
+
+def shutdown_process_pool():
+    """Stop the shared worker pool (call once at shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
@@ -0,0 +1,215 @@
+"""Exact and semantic cache of answered queries."""
+
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import time
+import numpy as np
+import orjson
+from backend.config import settings
+
+# Number of answered queries kept
+QUERY_CACHE_SIZE = 512
+
+# Cosine similarity above which a cached answer is returned as-is
+RESPONSE_SIMILARITY_THRESHOLD = 0.95
+
+# Cosine similarity above which cached retrieval results are reused
+RETRIEVAL_SIMILARITY_THRESHOLD = 0.90
+
+# Age after which an entry is dropped, so answers don't outlive the facts behind them
+QUERY_CACHE_TTL_SECONDS = 24 * 3600
+
+
+class QueryCache:
+    """
+    Cache of answered queries keyed by exact text and by embedding.
+    
+    An identical query (ignoring case and whitespace) or a near-identical
+    one returns the cached answer; a similar one reuses the cached
+    retrieval results so only re-ranking and generation run again.
+    Entries are appended to a JSON Lines file so the cache survives
+    restarts, and expire after QUERY_CACHE_TTL_SECONDS. Answers that used
+    web search results are never cached, since they are often
+    time-sensitive ("latest ...") and specific to their query.
+    """
+    
+    def __init__(self, path: Optional[str] = None, max_size: int = QUERY_CACHE_SIZE):
+        """
+        Initialize cache.
+        
+        Args:
+            path: Optional JSON Lines file used to persist entries
+            max_size: Maximum number of cached queries
+        """
+        self.path = Path(path) if path else None
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        
+        # Stacked embeddings of all entries, rebuilt lazily after changes
+        self._keys: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        
+        # Lines in the persisted file, including replaced and expired entries
+        self._file_lines = 0
+        
+        if self.path is not None:
+            self._load()
+    
+    @staticmethod
+    def key(query: str) -> str:
+        """Cache key for a query (case- and whitespace-insensitive)."""
+        return hashlib.sha256(" ".join(query.lower().split()).encode('utf-8')).hexdigest()
+    
+    def lookup(self, query: str, embedding: np.ndarray) -> Tuple[Optional[Dict], float]:
+        """
+        Find the cached entry closest to a query.
+        
+        Args:
+            query: User query
+            embedding: L2-normalized query embedding
+            
+        Returns:
+            Tuple of (entry or None, cosine similarity); an exact text
+            match has similarity 1.0
+        """
+        self._expire()
+        
+        entry = self._entries.get(self.key(query))
+        if entry is not None:
+            return entry, 1.0
+        
+        if not self._entries:
+            return None, 0.0
+        
+        if self._matrix is None:
+            self._keys = list(self._entries)
+            self._matrix = np.stack([self._entries[k]['embedding'] for k in self._keys])
+        
+        # Embeddings are normalized, so dot products are cosine similarities
+        scores = self._matrix @ embedding
+        best = int(np.argmax(scores))
+        
+        if scores[best] < RETRIEVAL_SIMILARITY_THRESHOLD:
+            return None, float(scores[best])
+        return self._entries[self._keys[best]], float(scores[best])
+    
+    def store(
+        self,
+        query: str,
+        embedding: np.ndarray,
+        response: str,
+        citations: List[Dict],
+        retrieved_chunks: List[Dict],
+        web_results: List[Dict]
+    ):
+        """
+        Cache the outcome of a query.
+        
+        Args:
+            query: User query
+            embedding: L2-normalized query embedding
+            response: Final response text
+            citations: Response citations
+            retrieved_chunks: Chunks returned by retrieval
+            web_results: Web search results returned by retrieval; if any,
+                nothing is cached
+        """
+        if web_results:
+            return
+        
+        entry = {
+            'query': query,
+            'created_at': time.time(),
+            'embedding': np.asarray(embedding, dtype=np.float32),
+            'response': response,
+            'citations': list(citations),
+            # Chunk vectors are large and can be recomputed by the re-ranker
+            'retrieved_chunks': [
+                {k: v for k, v in chunk.items() if k != 'embedding'}
+                for chunk in retrieved_chunks
+            ],
+            'web_results': []
+        }
+        self._add(self.key(query), entry)
+        
+        if self.path is not None:
+            with open(self.path, 'ab') as f:
+                f.write(orjson.dumps(
+                    entry,
+                    option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+                ))
+            self._file_lines += 1
+            self._compact_if_grown()
+    
+    def clear(self):
+        """Drop all entries (e.g. after the document set changes)."""
+        self._entries.clear()
+        self._matrix = None
+        if self.path is not None and self.path.exists():
+            self.path.write_bytes(b"")
+            self._file_lines = 0
+    
+    def _expire(self):
+        """Drop entries older than QUERY_CACHE_TTL_SECONDS."""
+        cutoff = time.time() - QUERY_CACHE_TTL_SECONDS
+        # Entries are kept in insertion order, so the oldest come first
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.get('created_at', 0) >= cutoff:
+                break
+            del self._entries[key]
+            self._matrix = None
+    
+    def _add(self, key: str, entry: Dict):
+        """Insert an entry, evicting the least recently added beyond max_size."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        self._matrix = None
+    
+    def _load(self):
+        """Load persisted entries, compacting the file if it has grown."""
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            return
+        
+        with open(self.path, 'rb') as f:
+            lines = f.readlines()
+        
+        for line in lines:
+            try:
+                entry = orjson.loads(line)
+                entry['embedding'] = np.asarray(entry['embedding'], dtype=np.float32)
+                self._add(self.key(entry['query']), entry)
+            except (orjson.JSONDecodeError, KeyError, TypeError):
+                continue
+        
+        self._file_lines = len(lines)
+        self._compact_if_grown()
+    
+    def _compact_if_grown(self):
+        """
+        Rewrite the file with only live entries once stale lines dominate.
+        
+        Replaced, evicted and expired entries stay in the append-only file
+        until they outnumber max_size, which bounds the file while running.
+        """
+        self._expire()
+        if self._file_lines <= len(self._entries) + self.max_size:
+            return
+        
+        self.path.write_bytes(b"".join(
+            orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY)
+            for entry in self._entries.values()
+        ))
+        self._file_lines = len(self._entries)
+
+
+@lru_cache(maxsize=1)
+def get_query_cache() -> QueryCache:
+    """Get the process-wide query cache."""
+    return QueryCache(settings.query_cache_path)
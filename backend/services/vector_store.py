@@ -1,11 +1,27 @@
 """Pinecone vector database interface."""
 
 from pinecone import Pinecone, ServerlessSpec
+from cachetools import TTLCache, cachedmethod
+from operator import attrgetter
 from typing import List, Dict, Optional
 from backend.config import settings
-from backend.services.embedding_service import EmbeddingService
+from backend.services.embedding_service import (
+    MULTI_PROCESS_MIN_TEXTS,
+    EmbeddingService,
+    get_embedding_batcher
+)
+from backend.services.embedding_cache import EmbeddingCache, get_embedding_cache
+import asyncio
+import numpy as np
 import time
 
+# Vectors per Pinecone upsert request, and requests in flight at once
+UPSERT_BATCH_SIZE = 100
+UPSERT_CONCURRENCY = 8
+
+# Index statistics are re-fetched from Pinecone at most this often
+STATS_TTL_SECONDS = 5.0
+
 
 class VectorStore:
     """Pinecone vector database interface."""
@@ -22,6 +38,8 @@ class VectorStore:
         self.pc = Pinecone(api_key=settings.pinecone_api_key)
         self.index_name = settings.pinecone_index_name
         self.embedding_service = EmbeddingService()
+        self.embedding_cache = get_embedding_cache()
+        self._stats_cache = TTLCache(maxsize=1, ttl=STATS_TTL_SECONDS)
         
         # Ensure index exists
         self._ensure_index_exists()
@@ -72,9 +90,27 @@ class VectorStore:
         # Extract texts for embedding
         texts = [chunk['content'] for chunk in chunks]
         
+        # Reuse embeddings of previously seen chunk texts
+        keys = [EmbeddingCache.key(text) for text in texts]
+        cached = self.embedding_cache.get_many(keys)
+        misses = {key: text for key, text in zip(keys, texts) if key not in cached}
+        
         # Generate embeddings in batch
-        print(f"🔄 Generating embeddings for {len(chunks)} chunks...")
-        embeddings = self.embedding_service.embed_batch(texts, show_progress=True)
+        if misses:
+            print(f"🔄 Generating embeddings for {len(misses)} chunks ({len(chunks) - len(misses)} cached)...")
+            if len(misses) >= MULTI_PROCESS_MIN_TEXTS:
+                # Large ingests are split across worker processes
+                new_embeddings = await asyncio.to_thread(
+                    self.embedding_service.embed_batch_multiprocess, list(misses.values())
+                )
+            else:
+                new_embeddings = await get_embedding_batcher().embed(list(misses.values()))
+            fresh = dict(zip(misses, new_embeddings))
+            self.embedding_cache.put_many(fresh)
+            cached.update(fresh)
+        
+        # Pinecone takes plain lists; convert only here, at upsert time
+        embeddings = [np.asarray(cached[key], dtype=np.float32).tolist() for key in keys]
         
         # Prepare vectors for Pinecone
         vectors = []
@@ -94,17 +130,23 @@ class VectorStore:
                 'metadata': metadata
             })
         
-        # Upsert to Pinecone in batches
-        batch_size = 100
+        # Upsert to Pinecone in batches, several requests in flight at once
+        semaphore = asyncio.Semaphore(UPSERT_CONCURRENCY)
         total_upserted = 0
         
-        print(f"🔄 Upserting {len(vectors)} vectors to Pinecone...")
-        for i in range(0, len(vectors), batch_size):
-            batch = vectors[i:i + batch_size]
-            self.index.upsert(vectors=batch)
+        async def upsert(batch: List[Dict]):
+            nonlocal total_upserted
+            async with semaphore:
+                await asyncio.to_thread(self.index.upsert, vectors=batch)
             total_upserted += len(batch)
             print(f"   Upserted {total_upserted}/{len(vectors)} vectors")
         
+        print(f"🔄 Upserting {len(vectors)} vectors to Pinecone...")
+        await asyncio.gather(*(
+            upsert(vectors[i:i + UPSERT_BATCH_SIZE])
+            for i in range(0, len(vectors), UPSERT_BATCH_SIZE)
+        ))
+        
         print(f"✅ Added {total_upserted} chunks to vector store")
         return total_upserted
     
@@ -125,14 +167,17 @@ class VectorStore:
         Returns:
             List of matching chunks with scores
         """
-        # Generate query embedding
-        query_embedding = self.embedding_service.embed_text(query)
+        # Embedding and the Pinecone call both block, so run them in a worker
+        # thread and let concurrent work (e.g. web search) proceed meanwhile
+        query_embedding = await asyncio.to_thread(self.embedding_service.embed_text, query)
         
         # Search Pinecone
-        results = self.index.query(
+        results = await asyncio.to_thread(
+            self.index.query,
             vector=query_embedding,
             top_k=top_k,
             include_metadata=True,
+            include_values=True,
             filter=filter_dict
         )
         
@@ -143,6 +188,7 @@ class VectorStore:
                 'chunk_id': match['id'],
                 'score': match['score'],
                 'content': match['metadata'].get('content', ''),
+                'embedding': match.get('values') or None,
                 'metadata': {
                     'doc_id': match['metadata'].get('doc_id'),
                     'filename': match['metadata'].get('filename'),
@@ -190,10 +236,14 @@ class VectorStore:
             print(f"❌ Error deleting chunks: {e}")
             return False
     
+    @cachedmethod(attrgetter('_stats_cache'))
     def get_stats(self) -> Dict:
         """
         Get vector store statistics.
         
+        Cached for STATS_TTL_SECONDS so frequent polling doesn't issue a
+        Pinecone request each time.
+        
         Returns:
             Dictionary with index statistics
         """
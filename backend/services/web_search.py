@@ -4,9 +4,37 @@ Free Web Search Integration - DuckDuckGo & Tavily
 This module provides free web search capabilities without requiring paid API keys.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from cachetools import TTLCache
 from duckduckgo_search import DDGS
 from backend.config import settings
+import asyncio
+import httpx
+
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# Web results keyed by (provider, query, max_results), kept for an hour
+_search_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+
+# Fetch in flight per key, so concurrent identical searches share a request.
+# An entry is removed only when its fetch finishes, never while awaited.
+_search_tasks: Dict[Tuple[str, str, int], "asyncio.Task[List[Dict]]"] = {}
+
+# Process-wide HTTP/2 client for outbound search API calls, created on first
+# use so every search reuses one TLS connection instead of a new handshake
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get (or lazily create) the shared outbound HTTP client."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            timeout=httpx.Timeout(15.0, connect=5.0)
+        )
+    return _http_client
 
 
 class WebSearchService:
@@ -14,6 +42,13 @@ class WebSearchService:
     
     def __init__(self):
         self.provider = settings.web_search_provider
+    
+    async def close(self):
+        """Close the shared outbound HTTP client (call once at shutdown)."""
+        global _http_client
+        if _http_client is not None:
+            await _http_client.aclose()
+            _http_client = None
         
     async def search(self, query: str, max_results: int = 5) -> List[Dict]:
         """
@@ -26,12 +61,32 @@ class WebSearchService:
         Returns:
             List of search results with title, url, and snippet
         """
+        key = (self.provider, query, max_results)
+        if key in _search_cache:
+            return list(_search_cache[key])
+        
+        # Concurrent identical searches await one shared fetch; the shield
+        # keeps a cancelled caller from cancelling it for the others
+        task = _search_tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, query, max_results))
+            _search_tasks[key] = task
+            task.add_done_callback(lambda done: _search_tasks.pop(key, None))
+        return list(await asyncio.shield(task))
+    
+    async def _fetch(self, key: Tuple[str, str, int], query: str, max_results: int) -> List[Dict]:
+        """Query the configured provider and cache non-empty results."""
         if self.provider == "duckduckgo":
-            return await self._duckduckgo_search(query, max_results)
+            results = await self._duckduckgo_search(query, max_results)
         elif self.provider == "tavily":
-            return await self._tavily_search(query, max_results)
+            results = await self._tavily_search(query, max_results)
         else:
             raise ValueError(f"Unknown search provider: {self.provider}")
+        
+        # Empty results usually mean a failed request; don't cache them
+        if results:
+            _search_cache[key] = results
+        return results
     
     async def _duckduckgo_search(self, query: str, max_results: int) -> List[Dict]:
         """
@@ -42,21 +97,30 @@ class WebSearchService:
         results = []
         
         try:
-            with DDGS() as ddgs:
-                search_results = ddgs.text(query, max_results=max_results)
-                
-                for result in search_results:
-                    results.append({
-                        'title': result.get('title', ''),
-                        'url': result.get('href', ''),
-                        'snippet': result.get('body', ''),
-                        'source': 'duckduckgo'
-                    })
+            # DDGS is blocking; run it off the event loop so it can overlap
+            # with other retrieval work
+            search_results = await asyncio.to_thread(
+                self._duckduckgo_text, query, max_results
+            )
+            
+            for result in search_results:
+                results.append({
+                    'title': result.get('title', ''),
+                    'url': result.get('href', ''),
+                    'snippet': result.get('body', ''),
+                    'source': 'duckduckgo'
+                })
         except Exception as e:
             print(f"DuckDuckGo search error: {e}")
             
         return results
     
+    @staticmethod
+    def _duckduckgo_text(query: str, max_results: int) -> List[Dict]:
+        """Run a blocking DuckDuckGo text search."""
+        with DDGS() as ddgs:
+            return list(ddgs.text(query, max_results=max_results))
+    
     async def _tavily_search(self, query: str, max_results: int) -> List[Dict]:
         """
         Search using Tavily API (FREE tier: 1000 requests/month).
@@ -68,14 +132,15 @@ class WebSearchService:
             raise ValueError("Tavily API key not configured")
         
         try:
-            # Import only if using Tavily
-            from tavily import TavilyClient
-            
-            client = TavilyClient(api_key=settings.tavily_api_key)
-            response = client.search(query, max_results=max_results)
+            response = await _get_http_client().post(
+                TAVILY_SEARCH_URL,
+                json={"query": query, "max_results": max_results},
+                headers={"Authorization": f"Bearer {settings.tavily_api_key}"}
+            )
+            response.raise_for_status()
             
             results = []
-            for result in response.get('results', []):
+            for result in response.json().get('results', []):
                 results.append({
                     'title': result.get('title', ''),
                     'url': result.get('url', ''),
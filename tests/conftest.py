@@ -0,0 +1,7 @@
+"""Shared pytest configuration."""
+
+import os
+import sys
+
+# Make the backend package importable when running pytest from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
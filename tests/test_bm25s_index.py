@@ -0,0 +1,67 @@
+"""Tests for the eagerly scored BM25 index."""
+
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from backend.services.bm25s_index import BM25SIndex
+
+CORPUS = [
+    "the cat sat on the mat".split(),
+    "the dog sat on the log".split(),
+    "cats and dogs".split(),
+    "retrieval augmented generation combines retrieval and generation".split(),
+    [],
+]
+
+
+def reference_scores(corpus, query, k1=1.5, b=0.75):
+    """Okapi BM25 computed term by term, document by document."""
+    n_docs = len(corpus)
+    avgdl = sum(len(doc) for doc in corpus) / n_docs
+    df = Counter(term for doc in corpus for term in set(doc))
+    
+    scores = []
+    for doc in corpus:
+        tf = Counter(doc)
+        score = 0.0
+        for term in query:
+            if term not in df:
+                continue
+            idf = math.log((n_docs - df[term] + 0.5) / (df[term] + 0.5) + 1.0)
+            freq = tf[term]
+            score += idf * freq * (k1 + 1) / (freq + k1 * (1 - b + b * len(doc) / avgdl))
+        scores.append(score)
+    return scores
+
+
+@pytest.mark.parametrize("query", [
+    ["cat"],
+    ["the", "sat"],
+    ["retrieval", "generation"],
+    ["sat", "sat"],  # repeated query terms count twice
+    ["unknown"],
+    [],
+])
+def test_scores_match_reference_formula(query):
+    index = BM25SIndex(CORPUS)
+    
+    scores = index.get_scores(query)
+    
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, reference_scores(CORPUS, query), rtol=1e-5, atol=1e-6)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = BM25SIndex(CORPUS, k1=1.2, b=0.5)
+    index.save(str(tmp_path))
+    
+    loaded = BM25SIndex.load(str(tmp_path))
+    
+    assert (loaded.k1, loaded.b) == (1.2, 0.5)
+    assert loaded.vocab == index.vocab
+    assert loaded.matrix.shape == index.matrix.shape
+    for query in (["cat"], ["the", "sat"], ["retrieval", "and"]):
+        np.testing.assert_array_equal(loaded.get_scores(query), index.get_scores(query))
@@ -0,0 +1,136 @@
+"""Tests for text splitting and columnar chunk batches."""
+
+import numpy as np
+
+from backend.services.chunking_service import (
+    MIN_CHUNK_LENGTH,
+    ChunkingService,
+    RegexTextSplitter
+)
+
+METADATA = {
+    'doc_id': 'doc',
+    'filename': 'doc.pdf',
+    'file_type': '.pdf',
+    'upload_timestamp': '2024-01-01T00:00:00'
+}
+
+
+def _positions(text, chunks):
+    """Offsets of each chunk in text, searching forward from the previous one."""
+    positions = []
+    offset = 0
+    for chunk in chunks:
+        offset = text.index(chunk, offset)
+        positions.append(offset)
+    return positions
+
+
+def test_short_text_is_one_stripped_chunk():
+    splitter = RegexTextSplitter(chunk_size=100, chunk_overlap=20)
+    assert splitter.split_text("  Just one line.  \n") == ["Just one line."]
+
+
+def test_empty_text_has_no_chunks():
+    splitter = RegexTextSplitter(chunk_size=100, chunk_overlap=20)
+    assert splitter.split_text("") == []
+    assert splitter.split_text(" \n\n ") == []
+
+
+def test_chunks_respect_size_and_end_at_sentences():
+    text = " ".join(f"Sentence number {i} is here." for i in range(40))
+    splitter = RegexTextSplitter(chunk_size=100, chunk_overlap=20)
+    
+    chunks = splitter.split_text(text)
+    
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    # Every window holds a sentence end in its second half
+    assert all(chunk.endswith(".") for chunk in chunks)
+
+
+def test_paragraph_break_is_preferred_over_sentence_end():
+    first = "First paragraph. " * 4  # 68 characters
+    text = first + "\n\n" + "Second paragraph words. " * 5
+    splitter = RegexTextSplitter(chunk_size=100, chunk_overlap=10)
+    
+    chunks = splitter.split_text(text)
+    
+    assert chunks[0] == first.strip()
+
+
+def test_consecutive_chunks_overlap():
+    text = " ".join(f"word{i}" for i in range(200))
+    splitter = RegexTextSplitter(chunk_size=100, chunk_overlap=30)
+    
+    chunks = splitter.split_text(text)
+    positions = _positions(text, chunks)
+    
+    for chunk, start, next_start in zip(chunks, positions, positions[1:]):
+        end = start + len(chunk)
+        # The next chunk begins inside this one, within the overlap
+        assert end - 30 <= next_start < end
+
+
+def test_text_without_boundaries_is_cut_hard():
+    text = "x" * 250
+    splitter = RegexTextSplitter(chunk_size=100, chunk_overlap=20)
+    
+    chunks = splitter.split_text(text)
+    
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    assert "".join(chunks) == text
+
+
+def test_chunk_batch_keeps_page_numbers_and_drops_noise():
+    content = (
+        "[Page 1]\nPage one has enough text.\n\n"
+        "[Page 2]\nshort\n\n"
+        "[Page 3]\nPage three has text too."
+    )
+    
+    batch = ChunkingService().chunk_document_batch(content, METADATA)
+    
+    assert batch.contents == ["Page one has enough text.", "Page three has text too."]
+    assert batch.page_numbers.tolist() == [1, 3]
+    assert batch.chunk_indices.tolist() == [0, 1]
+    assert batch.total_chunks == len(batch) == 2
+    assert all(size >= MIN_CHUNK_LENGTH for size in batch.sizes.tolist())
+
+
+def test_chunk_batch_records():
+    batch = ChunkingService().chunk_document_batch("Plain text without any page markers.", METADATA)
+    
+    records = batch.to_records()
+    
+    assert records == [{
+        'chunk_id': 'doc_chunk_0',
+        'content': "Plain text without any page markers.",
+        'metadata': {
+            'doc_id': 'doc',
+            'filename': 'doc.pdf',
+            'file_type': '.pdf',
+            'chunk_index': 0,
+            'page_number': None,
+            'total_chunks': 1,
+            'upload_timestamp': '2024-01-01T00:00:00'
+        }
+    }]
+    assert batch.get_stats() == {
+        'total_chunks': 1,
+        'avg_chunk_size': len(records[0]['content']),
+        'min_chunk_size': len(records[0]['content']),
+        'max_chunk_size': len(records[0]['content'])
+    }
+
+
+def test_chunk_pages_matches_marked_content():
+    pages = [(1, "Page one has enough text."), (2, "Page two has enough text.")]
+    marked = "".join(f"[Page {n}]\n{text}\n\n" for n, text in pages)
+    
+    service = ChunkingService()
+    streamed = service.chunk_pages(iter(pages), METADATA)
+    joined = service.chunk_document_batch(marked, METADATA)
+    
+    assert streamed.contents == joined.contents
+    np.testing.assert_array_equal(streamed.page_numbers, joined.page_numbers)
@@ -0,0 +1,53 @@
+"""Tests for the persistent embedding cache."""
+
+import numpy as np
+import pytest
+
+from backend.services.embedding_cache import EmbeddingCache
+
+DIM = 8
+
+
+def _vectors(n: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("quantize", [True, False])
+def test_round_trip(tmp_path, quantize):
+    path = str(tmp_path / "cache.db")
+    vectors = _vectors(3)
+    items = {EmbeddingCache.key(f"text {i}"): v for i, v in enumerate(vectors)}
+    
+    EmbeddingCache(path, model="m", dim=DIM, quantize=quantize).put_many(items)
+    found = EmbeddingCache(path, model="m", dim=DIM, quantize=quantize).get_many(items)
+    
+    assert found.keys() == items.keys()
+    for key, vector in items.items():
+        # int8 with a per-vector scale is within half a step of the original
+        atol = np.abs(vector).max() / 127 if quantize else 0
+        np.testing.assert_allclose(found[key], vector, atol=atol)
+
+
+@pytest.mark.parametrize("quantize", [True, False])
+def test_warm_and_cold_lookups_agree(tmp_path, quantize):
+    path = str(tmp_path / "cache.db")
+    items = {EmbeddingCache.key("text"): _vectors(1)[0]}
+    
+    cache = EmbeddingCache(path, model="m", dim=DIM, quantize=quantize)
+    cache.put_many(items)
+    warm = cache.get_many(items)
+    cold = EmbeddingCache(path, model="m", dim=DIM, quantize=quantize).get_many(items)
+    
+    for key in items:
+        np.testing.assert_array_equal(warm[key], cold[key])
+
+
+def test_entries_are_scoped_to_model(tmp_path):
+    path = str(tmp_path / "cache.db")
+    items = {EmbeddingCache.key("text"): _vectors(1)[0]}
+    
+    EmbeddingCache(path, model="m|sbert|fp16", dim=DIM).put_many(items)
+    
+    assert EmbeddingCache(path, model="m|onnx|fp32", dim=DIM).get_many(items) == {}
@@ -0,0 +1,48 @@
+"""Tests for the BM25 side of hybrid search."""
+
+import pytest
+
+from backend.config import settings
+from backend.services.hybrid_search import HybridSearch
+
+
+def _chunk(doc_id: str, index: int, content: str) -> dict:
+    return {
+        'chunk_id': f"{doc_id}_chunk_{index}",
+        'content': content,
+        'metadata': {'doc_id': doc_id, 'chunk_index': index}
+    }
+
+
+@pytest.fixture
+def search(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "bm25_cache_path", str(tmp_path / "bm25"))
+    # Dense retrieval is not exercised here
+    return HybridSearch(vector_store=None)
+
+
+def test_uploaded_chunks_are_searchable(search):
+    search.add_to_bm25([_chunk("a", 0, "transformer attention heads")])
+    search.add_to_bm25([_chunk("b", 0, "quarterly revenue grew")])
+    
+    results = search._bm25_search("revenue", top_k=5)
+    
+    assert [r['chunk_id'] for r in results] == ["b_chunk_0"]
+    assert results[0]['content'] == "quarterly revenue grew"
+
+
+def test_removed_document_is_not_found(search):
+    search.add_to_bm25([_chunk("a", 0, "transformer attention"), _chunk("b", 0, "revenue report")])
+    
+    search.remove_from_bm25("b")
+    
+    assert search._bm25_search("revenue", top_k=5) == []
+    assert [c['chunk_id'] for c in search.bm25_metadata] == ["a_chunk_0"]
+
+
+def test_saved_index_is_reloaded(search):
+    search.add_to_bm25([_chunk("a", 0, "transformer attention heads")])
+    
+    reloaded = HybridSearch(vector_store=None)
+    
+    assert [r['chunk_id'] for r in reloaded._bm25_search("attention", top_k=5)] == ["a_chunk_0"]
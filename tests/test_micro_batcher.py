@@ -0,0 +1,109 @@
+"""Tests for the async micro-batcher."""
+
+import asyncio
+
+from backend.services.micro_batcher import MicroBatcher
+
+
+def test_concurrent_requests_share_one_call():
+    calls = []
+    
+    async def double(batch):
+        calls.append(list(batch))
+        return [x * 2 for x in batch]
+    
+    async def run():
+        batcher = MicroBatcher(double, window_seconds=0.01, max_batch=100)
+        try:
+            return await asyncio.gather(
+                batcher.submit([1, 2]),
+                batcher.submit([3]),
+                batcher.submit([4, 5, 6])
+            )
+        finally:
+            await batcher.close()
+    
+    results = asyncio.run(run())
+    
+    assert [list(r) for r in results] == [[2, 4], [6], [8, 10, 12]]
+    assert calls == [[1, 2, 3, 4, 5, 6]]
+
+
+def test_max_batch_splits_calls():
+    calls = []
+    
+    async def identity(batch):
+        calls.append(len(batch))
+        return batch
+    
+    async def run():
+        batcher = MicroBatcher(identity, window_seconds=0.01, max_batch=2)
+        try:
+            return await asyncio.gather(*(batcher.submit([i]) for i in range(5)))
+        finally:
+            await batcher.close()
+    
+    results = asyncio.run(run())
+    
+    assert [list(r) for r in results] == [[i] for i in range(5)]
+    assert all(size <= 2 for size in calls)
+    assert sum(calls) == 5
+
+
+def test_batch_error_reaches_every_caller():
+    async def fail(batch):
+        raise RuntimeError("backend down")
+    
+    async def run():
+        batcher = MicroBatcher(fail, window_seconds=0.01, max_batch=100)
+        try:
+            return await asyncio.gather(
+                batcher.submit([1]),
+                batcher.submit([2]),
+                return_exceptions=True
+            )
+        finally:
+            await batcher.close()
+    
+    results = asyncio.run(run())
+    
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_close_cancels_in_flight_and_queued_requests():
+    async def run():
+        started = asyncio.Event()
+        
+        async def hang(batch):
+            started.set()
+            await asyncio.Event().wait()
+        
+        batcher = MicroBatcher(hang, window_seconds=0, max_batch=1)
+        in_flight = asyncio.create_task(batcher.submit([1]))
+        await started.wait()
+        queued = asyncio.create_task(batcher.submit([2]))
+        await asyncio.sleep(0)
+        
+        await batcher.close()
+        await asyncio.gather(in_flight, queued, return_exceptions=True)
+        return in_flight, queued
+    
+    in_flight, queued = asyncio.run(run())
+    
+    assert in_flight.cancelled()
+    assert queued.cancelled()
+
+
+def test_batcher_restarts_after_close():
+    async def identity(batch):
+        return batch
+    
+    async def run():
+        batcher = MicroBatcher(identity, window_seconds=0, max_batch=10)
+        first = await batcher.submit(["a"])
+        await batcher.close()
+        second = await batcher.submit(["b"])
+        await batcher.close()
+        return list(first), list(second)
+    
+    assert asyncio.run(run()) == (["a"], ["b"])
@@ -0,0 +1,34 @@
+"""Tests for query classification and post-analysis routing."""
+
+import pytest
+
+from backend.agents.query_analysis_agent import _cached_rule_analysis, is_small_talk
+from backend.agents.workflow import RAGWorkflow
+
+QUESTIONS_WITH_GREETINGS = [
+    "Hello, can you summarize the uploaded paper on transformer attention?",
+    "Thanks! Now what does section 3 of the report say about revenue?",
+]
+
+
+def _route(query: str, query_type: str) -> str:
+    return RAGWorkflow._route_after_analysis({"query": query, "query_type": query_type})
+
+
+@pytest.mark.parametrize("query", ["hello", "Hi!", "  thank you. ", "Thanks!!"])
+def test_pure_small_talk_skips_retrieval(query):
+    assert is_small_talk(query)
+    assert _cached_rule_analysis(query.lower())[0] == "conversational"
+    assert _route(query, "conversational") == "generation"
+
+
+@pytest.mark.parametrize("query", QUESTIONS_WITH_GREETINGS)
+def test_greeting_with_question_is_not_small_talk(query):
+    assert not is_small_talk(query)
+    assert _cached_rule_analysis(query.lower())[0] != "conversational"
+
+
+@pytest.mark.parametrize("query", QUESTIONS_WITH_GREETINGS)
+def test_greeting_with_question_is_retrieved(query):
+    # Even if the LLM labels the tone conversational, documents are fetched
+    assert _route(query, "conversational") == "retrieval"
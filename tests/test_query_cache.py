@@ -0,0 +1,100 @@
+"""Tests for the query cache."""
+
+import numpy as np
+
+from backend.services import query_cache
+from backend.services.query_cache import (
+    RESPONSE_SIMILARITY_THRESHOLD,
+    RETRIEVAL_SIMILARITY_THRESHOLD,
+    QueryCache
+)
+
+
+def _unit(*values) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _store(cache: QueryCache, query: str, embedding: np.ndarray, web_results=()):
+    chunks = [{'chunk_id': 'c', 'embedding': [1.0]}]
+    cache.store(query, embedding, f"answer to {query}", [], chunks, list(web_results))
+
+
+def test_exact_match_ignores_case_and_whitespace():
+    cache = QueryCache()
+    _store(cache, "What is RAG?", _unit(1, 0))
+    
+    entry, score = cache.lookup("  what is   rag? ", _unit(0, 1))
+    
+    assert score == 1.0
+    assert entry['response'] == "answer to What is RAG?"
+    # Chunk vectors are not kept
+    assert entry['retrieved_chunks'] == [{'chunk_id': 'c'}]
+
+
+def test_similarity_thresholds():
+    cache = QueryCache()
+    _store(cache, "q", _unit(1, 0))
+    
+    # cos = 0.96: close enough to reuse the answer
+    entry, score = cache.lookup("other", _unit(0.96, np.sqrt(1 - 0.96 ** 2)))
+    assert entry is not None and score >= RESPONSE_SIMILARITY_THRESHOLD
+    
+    # cos = 0.92: retrieval can be reused, but not the answer
+    entry, score = cache.lookup("other", _unit(0.92, np.sqrt(1 - 0.92 ** 2)))
+    assert entry is not None
+    assert RETRIEVAL_SIMILARITY_THRESHOLD <= score < RESPONSE_SIMILARITY_THRESHOLD
+    
+    # cos = 0.5: unrelated
+    entry, score = cache.lookup("other", _unit(0.5, np.sqrt(0.75)))
+    assert entry is None and score < RETRIEVAL_SIMILARITY_THRESHOLD
+
+
+def test_web_backed_answers_are_not_cached():
+    cache = QueryCache()
+    _store(cache, "latest news", _unit(1, 0), web_results=[{'url': 'u'}])
+    
+    assert cache.lookup("latest news", _unit(1, 0)) == (None, 0.0)
+
+
+def test_entries_expire(monkeypatch):
+    cache = QueryCache()
+    _store(cache, "q", _unit(1, 0))
+    
+    now = query_cache.time.time()
+    later = now + query_cache.QUERY_CACHE_TTL_SECONDS + 1
+    monkeypatch.setattr(query_cache.time, "time", lambda: later)
+    
+    assert cache.lookup("q", _unit(1, 0))[0] is None
+
+
+def test_persisted_round_trip(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+    _store(QueryCache(path), "q", _unit(1, 0))
+    
+    entry, score = QueryCache(path).lookup("q", _unit(1, 0))
+    
+    assert score == 1.0
+    np.testing.assert_allclose(entry['embedding'], _unit(1, 0))
+
+
+def test_file_is_compacted_while_running(tmp_path):
+    path = tmp_path / "cache.jsonl"
+    cache = QueryCache(str(path), max_size=4)
+    
+    # The same query over and over leaves one live entry
+    for _ in range(20):
+        _store(cache, "q", _unit(1, 0))
+    
+    assert len(path.read_bytes().splitlines()) <= 1 + 4
+
+
+def test_clear_empties_file(tmp_path):
+    path = tmp_path / "cache.jsonl"
+    cache = QueryCache(str(path))
+    _store(cache, "q", _unit(1, 0))
+    
+    cache.clear()
+    
+    assert path.read_bytes() == b""
+    assert QueryCache(str(path)).lookup("q", _unit(1, 0))[0] is None
@@ -0,0 +1,39 @@
+"""Tests for request body parsing in the vector DB MCP server."""
+
+import asyncio
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+from backend.mcp.servers.vector_db_server import read_json_list
+
+
+class _Request:
+    def __init__(self, body: bytes):
+        self._body = body
+    
+    async def body(self) -> bytes:
+        return self._body
+
+
+def _read(body: bytes, item_type=str):
+    return asyncio.run(read_json_list(_Request(body), "texts", item_type))
+
+
+def test_valid_list():
+    assert _read(orjson.dumps({"texts": ["a", "b"]})) == ["a", "b"]
+
+
+@pytest.mark.parametrize("body, status", [
+    (b"not json", 400),
+    (orjson.dumps(["a"]), 422),
+    (orjson.dumps({"texts": "a"}), 422),
+    (orjson.dumps({"texts": ["a", 1]}), 422),
+    (orjson.dumps({"texts": ["a", None]}), 422),
+    (orjson.dumps({"texts": [["a"]]}), 422),
+])
+def test_malformed_bodies_are_rejected(body, status):
+    with pytest.raises(HTTPException) as error:
+        _read(body)
+    assert error.value.status_code == status
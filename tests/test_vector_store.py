@@ -0,0 +1,59 @@
+"""Tests for VectorStore query paths."""
+
+import asyncio
+import time
+
+from backend.services.vector_store import VectorStore
+
+# Simulated latency of each blocking call
+BLOCKING_SECONDS = 0.3
+
+
+class _SlowEmbeddingService:
+    def embed_text(self, text):
+        time.sleep(BLOCKING_SECONDS / 2)
+        return [0.0, 1.0]
+
+
+class _SlowIndex:
+    def query(self, **kwargs):
+        time.sleep(BLOCKING_SECONDS / 2)
+        return {'matches': [{
+            'id': 'doc_0',
+            'score': 0.9,
+            'values': [0.0, 1.0],
+            'metadata': {'content': 'text', 'doc_id': 'doc', 'chunk_index': 0}
+        }]}
+
+
+def _make_store() -> VectorStore:
+    # Bypass __init__, which connects to Pinecone
+    store = VectorStore.__new__(VectorStore)
+    store.embedding_service = _SlowEmbeddingService()
+    store.index = _SlowIndex()
+    return store
+
+
+def test_similarity_search_formats_matches():
+    results = asyncio.run(_make_store().similarity_search("query", top_k=1))
+    
+    assert results[0]['chunk_id'] == 'doc_0'
+    assert results[0]['content'] == 'text'
+    assert results[0]['metadata']['doc_id'] == 'doc'
+
+
+def test_similarity_search_overlaps_with_other_work():
+    store = _make_store()
+    
+    async def search_alongside_web():
+        start = time.perf_counter()
+        await asyncio.gather(
+            store.similarity_search("query"),
+            asyncio.sleep(BLOCKING_SECONDS)  # stands in for the web search
+        )
+        return time.perf_counter() - start
+    
+    elapsed = asyncio.run(search_alongside_web())
+    
+    # Run back to back this would take 2 * BLOCKING_SECONDS
+    assert elapsed < BLOCKING_SECONDS * 1.5
@@ -0,0 +1,53 @@
+"""Tests for web search request deduplication."""
+
+import asyncio
+
+from backend.services import web_search
+from backend.services.web_search import WebSearchService
+
+
+def _counting_service(monkeypatch, results):
+    calls = []
+    
+    async def fake_search(self, query, max_results):
+        calls.append(query)
+        await asyncio.sleep(0.05)
+        return list(results)
+    
+    monkeypatch.setattr(WebSearchService, "_duckduckgo_search", fake_search)
+    monkeypatch.setattr(web_search, "_search_cache", {})
+    service = WebSearchService()
+    service.provider = "duckduckgo"
+    return service, calls
+
+
+def test_concurrent_identical_searches_share_one_fetch(monkeypatch):
+    # Empty results are never cached, so only in-flight sharing can dedupe
+    service, calls = _counting_service(monkeypatch, [])
+    
+    async def run():
+        first = asyncio.create_task(service.search("q"))
+        await asyncio.sleep(0.01)
+        # Joins while the first fetch is in flight
+        rest = await asyncio.gather(*(service.search("q") for _ in range(5)))
+        return [await first, *rest]
+    
+    results = asyncio.run(run())
+    
+    assert calls == ["q"]
+    assert results == [[]] * 6
+    assert web_search._search_tasks == {}
+
+
+def test_cancelled_caller_does_not_cancel_shared_fetch(monkeypatch):
+    service, calls = _counting_service(monkeypatch, [{'title': 't'}])
+    
+    async def run():
+        first = asyncio.create_task(service.search("q"))
+        second = asyncio.create_task(service.search("q"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+    
+    assert asyncio.run(run()) == [{'title': 't'}]
+    assert calls == ["q"]